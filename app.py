@@ -2,6 +2,7 @@ import streamlit as st
 import os
 import warnings
 from components.theme_manager import ThemeManager
+from components.admin_panel import AdminPanel
 from components.auth_handler import AuthHandler
 from components.chat_interface import ChatInterface
 from components.settings_panel import SettingsPanel
@@ -31,6 +32,9 @@ def main():
     # Apply theme CSS
     theme_manager.apply_theme()
     
+    # Show notifications queued before the last rerun
+    session_manager.render_notifications()
+    
     # Render header with theme toggle
     theme_manager.render_header()
     
@@ -52,9 +56,13 @@ def main():
     suggestions_engine.handle_actions()
     suggestions_engine.render_suggestions()
     suggestions_engine.render_writing_assistance()
+    suggestions_engine.render_bulk_grammar_fix()
     
     # Render pro tips
     render_pro_tips()
+    
+    # Render AI call metrics (admin deployments only)
+    AdminPanel().render()
 
 def render_pro_tips():
     """Render the pro tips section"""
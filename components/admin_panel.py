@@ -0,0 +1,57 @@
+import streamlit as st
+from config.settings import AppConfig
+from utils.job_manager import get_job_manager
+from utils.metrics import get_metrics
+from utils.model_catalog import get_model_catalog
+from utils.prefetcher import get_prefetcher
+from utils.response_cache import get_response_cache
+
+class AdminPanel:
+    """In-app view of AI call metrics (needs FEATURES['analytics'] and METRICS_CONFIG['admin_panel'])"""
+    
+    def __init__(self):
+        self.metrics = get_metrics()
+    
+    def render(self):
+        """Render the metrics panel"""
+        if not AppConfig.is_feature_enabled('analytics') or not self.metrics.config['admin_panel']:
+            return
+        
+        with st.expander("📈 Metrics"):
+            rows = self.metrics.summary()
+            self._render_totals(rows)
+            
+            if rows:
+                # Busiest (model, task) pairs first; latencies are estimated from histogram buckets
+                st.dataframe(rows, use_container_width=True)
+            else:
+                st.caption("No AI requests recorded yet.")
+            
+            self._render_subsystems()
+            
+            if self.metrics.server_error:
+                st.caption(f"⚠️ /metrics endpoint not started here: {self.metrics.server_error}")
+            elif self.metrics.config['serve']:
+                st.caption(f"📡 Prometheus endpoint: {self.metrics.endpoint_url()}")
+    
+    def _render_totals(self, rows: list):
+        """Render headline numbers across all models and tasks"""
+        requests = sum(row['requests'] for row in rows)
+        errors = sum(row['errors'] for row in rows)
+        tokens = sum(row['prompt_tokens'] + row['completion_tokens'] for row in rows)
+        hit_rate = self.metrics.cache_hit_rate()
+        
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("Requests", requests)
+        col2.metric("Error rate", f"{errors / requests:.1%}" if requests else "–")
+        col3.metric("Tokens", tokens)
+        col4.metric("Cache hit rate", f"{hit_rate:.0%}" if hit_rate is not None else "–")
+    
+    def _render_subsystems(self):
+        """Render stats of the shared background subsystems"""
+        st.json({
+            'response_cache': get_response_cache().stats(),
+            'jobs': get_job_manager().stats(),
+            'prefetch': get_prefetcher().stats(),
+            'model_catalog': get_model_catalog().stats()
+        }, expanded=False)
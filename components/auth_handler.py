@@ -1,7 +1,6 @@
 import streamlit as st
-import httpx
-from groq import Groq
-import time
+from utils.client_pool import get_client_pool
+from utils.key_validator import validate_api_key
 
 class AuthHandler:
     """Handles API key authentication and setup"""
@@ -19,20 +18,8 @@ class AuthHandler:
         return self.session_manager.get('api_configured', False)
     
     def validate_api_key(self, api_key: str) -> bool:
-        """Validate the provided API key"""
-        try:
-            http_client = httpx.Client(verify=False)
-            client = Groq(api_key=api_key.strip(), http_client=http_client)
-            
-            # Test the API key with a simple request
-            response = client.chat.completions.create(
-                messages=[{"role": "user", "content": "test"}],
-                model="llama-3.1-8b-instant",
-                max_tokens=5
-            )
-            return True
-        except Exception:
-            return False
+        """Validate the provided API key (models list over the pooled client, cached)"""
+        return validate_api_key(api_key)
     
     def save_api_key(self, api_key: str) -> bool:
         """Save and configure the API key"""
@@ -66,8 +53,7 @@ class AuthHandler:
                 if api_key:
                     with st.spinner("Validating API key..."):
                         if self.save_api_key(api_key):
-                            st.success("🚀 Ready to chat!")
-                            time.sleep(1)
+                            self.session_manager.notify("Ready to chat!", icon="🚀")
                             st.rerun()
                         else:
                             st.error("❌ Invalid API key")
@@ -108,5 +94,4 @@ class AuthHandler:
             raise Exception("Not authenticated")
         
         api_key = self.session_manager.get('api_key')
-        http_client = httpx.Client(verify=False)
-        return Groq(api_key=api_key, http_client=http_client)
\ No newline at end of file
+        return get_client_pool().get(api_key)
\ No newline at end of file
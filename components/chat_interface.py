@@ -1,5 +1,5 @@
 import streamlit as st
-import time
+from config.settings import AppConfig
 from utils.session_manager import SessionManager
 
 class ChatInterface:
@@ -20,44 +20,84 @@ class ChatInterface:
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.markdown('<h3 class="card-title">💬 Chat Simulation</h3>', unsafe_allow_html=True)
         
-        st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-        
-        chat_history = self.session_manager.get('chat_history', [])
+        chat_history = self.session_manager.get_chat_history()
         
         if chat_history:
-            for message in chat_history:
-                self._render_message(message)
+            self._render_transcript(chat_history)
         else:
             # Default first message
             self._render_default_message()
         
         st.markdown("</div>", unsafe_allow_html=True)
-        st.markdown("</div>", unsafe_allow_html=True)
     
-    def _render_message(self, message):
-        """Render a single chat message"""
-        if message['type'] == 'received':
-            st.markdown(f"""
-            <div class="chat-message other-message">
-                <div class="message-sender">Friend</div>
-                <div class="message-bubble">{message['text']}</div>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            st.markdown(f"""
-            <div class="chat-message user-message">
-                <div class="message-sender" style="text-align: right; color: rgba(255,255,255,0.8);">You</div>
-                <div class="message-bubble">{message['text']}</div>
-            </div>
-            """, unsafe_allow_html=True)
+    def _render_transcript(self, chat_history):
+        """Render the newest pages of the transcript as a single HTML block
+        
+        Pages are aligned to the start of the history, so every page except
+        the newest is immutable until the chat is cleared and its HTML is
+        reused across reruns.
+        """
+        page_size = AppConfig.UI_CONFIG['transcript_page_size']
+        page_count = -(-len(chat_history) // page_size)
+        first_page = max(0, page_count - self.session_manager.get('transcript_pages', 1))
+        
+        if first_page > 0:
+            hidden = first_page * page_size
+            if st.button(f"⬆️ Load earlier messages ({hidden} hidden)", key="load_earlier_btn"):
+                self.session_manager.set('transcript_pages', self.session_manager.get('transcript_pages', 1) + 1)
+                st.rerun()
+        
+        cache = self.session_manager.get('transcript_cache')
+        if cache is None:
+            cache = {}
+            self.session_manager.set('transcript_cache', cache)
+        
+        pages = []
+        visible_keys = set()
+        for page in range(first_page, page_count):
+            start = page * page_size
+            stop = min(start + page_size, len(chat_history))
+            # Appends only ever grow the newest page, so this identifies its content
+            cache_key = (chat_history.generation, start, stop)
+            html = cache.get(cache_key)
+            if html is None:
+                html = "".join(self._message_html(message) for message in chat_history[start:stop])
+                cache[cache_key] = html
+            pages.append(html)
+            visible_keys.add(cache_key)
+        
+        # Drop pages that scrolled out of the window or went stale
+        for cache_key in [key for key in cache if key not in visible_keys]:
+            del cache[cache_key]
+        
+        st.markdown(f'<div class="chat-container">{"".join(pages)}</div>', unsafe_allow_html=True)
+    
+    @staticmethod
+    def _message_html(message) -> str:
+        """Build the HTML for a single chat message"""
+        if message.type == 'received':
+            return (
+                '<div class="chat-message other-message">'
+                '<div class="message-sender">Friend</div>'
+                f'<div class="message-bubble">{message.text}</div>'
+                '</div>'
+            )
+        return (
+            '<div class="chat-message user-message">'
+            '<div class="message-sender" style="text-align: right; color: rgba(255,255,255,0.8);">You</div>'
+            f'<div class="message-bubble">{message.text}</div>'
+            '</div>'
+        )
     
     def _render_default_message(self):
         """Render the default welcome message"""
         st.markdown("""
+        <div class="chat-container">
         <div class="chat-message other-message">
             <div class="message-sender">Friend</div>
             <div class="message-bubble">Hey! How's your day going? 😊</div>
         </div>
+        </div>
         """, unsafe_allow_html=True)
     
     def _render_typing_area(self):
@@ -65,8 +105,19 @@ class ChatInterface:
         st.markdown('<div class="card">', unsafe_allow_html=True)
         st.markdown('<h3 class="card-title">✏️ Compose Your Reply</h3>', unsafe_allow_html=True)
         
-        # Text area for user input
+        autocorrect_enabled = self.session_manager.get('autocorrect_enabled', True)
+        autocorrector = self.session_manager.get_autocorrector()
+        
+        # Apply a finished background correction if the draft is still the one it checked
         current_draft = self.session_manager.get('current_draft', '')
+        corrected = autocorrector.result_for(current_draft) if autocorrect_enabled else None
+        if corrected:
+            # Get Help / auto-fix requested for the uncorrected draft still apply
+            self.session_manager.rekey_jobs(current_draft.strip(), corrected.strip())
+            current_draft = corrected
+            self.session_manager.set('current_draft', corrected)
+        
+        # Text area for user input
         user_input = st.text_area(
             "",
             value=current_draft,
@@ -78,11 +129,36 @@ class ChatInterface:
         # Update session state with current text
         self.session_manager.set('current_draft', user_input)
         
+        if autocorrect_enabled:
+            autocorrector.submit(
+                user_input,
+                self.session_manager.get('api_key', ''),
+                self.session_manager.get_session_id(),
+                self.session_manager.get_ai_settings()
+            )
+            if corrected:
+                st.caption("✨ Auto-corrected")
+            self._render_autocorrect_poller(autocorrector, user_input)
+        else:
+            autocorrector.cancel()
+        
         # Action buttons
         self._render_action_buttons(user_input)
         
         st.markdown("</div>", unsafe_allow_html=True)
     
+    def _render_autocorrect_poller(self, autocorrector, draft):
+        """Rerun once a background correction for the draft is ready"""
+        if not autocorrector.in_flight:
+            return
+        
+        @st.fragment(run_every=AppConfig.AUTOCORRECT_CONFIG['poll_interval'])
+        def poll_autocorrect():
+            if autocorrector.result_for(draft) is not None:
+                st.rerun()
+        
+        poll_autocorrect()
+    
     def _render_action_buttons(self, user_input):
         """Render the main action buttons"""
         col1, col2, col3 = st.columns(3)
@@ -137,7 +213,7 @@ class ChatInterface:
     
     def _render_chat_controls(self):
         """Render chat control buttons"""
-        chat_history = self.session_manager.get('chat_history', [])
+        chat_history = self.session_manager.get_chat_history()
         
         if chat_history:
             st.markdown('<div class="card">', unsafe_allow_html=True)
@@ -146,8 +222,7 @@ class ChatInterface:
             with col1:
                 if st.button("🗑️ Clear Chat", key="clear_chat_btn"):
                     self.session_manager.clear_chat_history()
-                    st.success("Chat cleared!")
-                    time.sleep(1)
+                    self.session_manager.notify("Chat cleared!", icon="🗑️")
                     st.rerun()
             
             with col2:
@@ -160,17 +235,19 @@ class ChatInterface:
         """Send a message and add it to chat history"""
         self.session_manager.add_message('sent', message)
         self.session_manager.set('current_draft', '')
-        st.success("✅ Message sent!")
-        time.sleep(1)
+        self.session_manager.get_autocorrector().cancel()
+        self.session_manager.cancel_prefetch()
+        self.session_manager.notify("Message sent!", icon="✅")
         st.rerun()
     
     def _show_chat_stats(self):
         """Display chat statistics"""
-        chat_history = self.session_manager.get('chat_history', [])
+        chat_history = self.session_manager.get_chat_history()
         
+        # Running counters; no scan over the history
         total_messages = len(chat_history)
-        sent_messages = len([msg for msg in chat_history if msg['type'] == 'sent'])
-        received_messages = len([msg for msg in chat_history if msg['type'] == 'received'])
+        sent_messages = chat_history.sent_count
+        received_messages = chat_history.received_count
         
         st.info(f"""
         **📊 Chat Statistics:**
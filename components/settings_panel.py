@@ -1,5 +1,7 @@
 import streamlit as st
 from utils.session_manager import SessionManager
+from utils.model_catalog import get_model_catalog
+from utils.prompt_templates import template_token_counts
 from config.settings import AppConfig
 
 class SettingsPanel:
@@ -63,15 +65,25 @@ class SettingsPanel:
     def _render_model_selector(self):
         """Render AI model selector"""
         current_model = self.session_manager.get('ai_model', '🎯 Balanced')
+        catalog = get_model_catalog()
         
         model = st.selectbox(
             "AI Model",
             self.config.AI_MODELS,
             index=self.config.AI_MODELS.index(current_model),
+            format_func=lambda key: key if catalog.is_available(catalog.resolve(key)) else f"{key} (unavailable)",
             key="model_selector"
         )
         
         self.session_manager.set('ai_model', model)
+        
+        info = catalog.model_info(model)
+        details = [info['name'], f"{info['context_window'] // 1024}K context"]
+        if info['samples']:
+            details.append(f"p50 {info['p50']:.1f}s · p95 {info['p95']:.1f}s")
+        if info['tokens_per_sec']:
+            details.append(f"{info['tokens_per_sec']:.0f} tok/s")
+        st.caption(" · ".join(details))
     
     def _render_autocorrect_toggle(self):
         """Render autocorrect toggle"""
@@ -111,6 +123,14 @@ class SettingsPanel:
                     help="Maximum length of AI responses"
                 )
                 self.session_manager.set('max_tokens', max_tokens)
+                
+                # Single-request Get Help
+                all_in_one_help = st.checkbox(
+                    "🧩 All-in-one Get Help",
+                    value=self.session_manager.get('all_in_one_help', False),
+                    help="Fix grammar, suggest replies and read the mood in one request"
+                )
+                self.session_manager.set('all_in_one_help', all_in_one_help)
             
             with col2:
                 # Context messages
@@ -135,6 +155,15 @@ class SettingsPanel:
                 )
                 self.session_manager.set('auto_send_delay', auto_send_delay)
             
+            # What each task's fixed prompt costs with the current style and length
+            token_counts = template_token_counts(
+                self.session_manager.get('chat_style'),
+                self.session_manager.get('reply_length')
+            )
+            st.caption("🧾 Prompt overhead (tokens): " + " · ".join(
+                f"{task} ~{tokens}" for task, tokens in token_counts.items()
+            ))
+            
             # Export/Import Settings
             self._render_settings_management()
     
@@ -183,6 +212,7 @@ class SettingsPanel:
             'max_tokens': self.session_manager.get('max_tokens'),
             'context_messages': self.session_manager.get('context_messages'),
             'auto_send_delay': self.session_manager.get('auto_send_delay'),
+            'all_in_one_help': self.session_manager.get('all_in_one_help'),
             'dark_mode': self.session_manager.get('dark_mode')
         }
         
@@ -198,7 +228,8 @@ class SettingsPanel:
             # Validate and apply settings
             for key, value in settings.items():
                 if key in ['chat_style', 'reply_length', 'ai_model', 'autocorrect_enabled',
-                          'temperature', 'max_tokens', 'context_messages', 'auto_send_delay', 'dark_mode']:
+                          'temperature', 'max_tokens', 'context_messages', 'auto_send_delay',
+                          'all_in_one_help', 'dark_mode']:
                     self.session_manager.set(key, value)
             
             st.success("✅ Settings imported successfully!")
@@ -218,6 +249,7 @@ class SettingsPanel:
             'max_tokens': 400,
             'context_messages': 6,
             'auto_send_delay': 0,
+            'all_in_one_help': False,
             'dark_mode': False
         }
         
@@ -1,7 +1,14 @@
 import streamlit as st
-import time
+import json
 from utils.session_manager import SessionManager
+from utils.job_manager import Job, JobLimitExceeded
+from utils.prefetcher import get_prefetcher, prefetch_key
+from utils.prompt_templates import render_prompt
 from utils.ai_client import AIClient
+from utils.async_ai_client import get_help
+from utils.suggestion_parser import parse_suggestions
+from utils.token_estimator import estimate_suggestions
+from config.settings import AppConfig
 from components.auth_handler import AuthHandler
 
 class SuggestionsEngine:
@@ -12,7 +19,7 @@ class SuggestionsEngine:
         self.auth_handler = AuthHandler()
     
     def generate_suggestions(self):
-        """Generate AI suggestions for user input"""
+        """Start generating AI suggestions for user input in the background"""
         if not self.auth_handler.is_authenticated():
             st.error("Please configure your API key first!")
             return
@@ -22,43 +29,140 @@ class SuggestionsEngine:
             st.warning("Please type a message first!")
             return
         
-        # Show loading state
-        self.session_manager.set('loading', True)
+        request = self._suggestions_request(user_input)
+        self.session_manager.clear_suggestions()
+        self.session_manager.update({'generate_suggestions': False, 'suggestions_key': request['key']})
         
-        with st.spinner("🤖 Generating smart suggestions..."):
-            try:
-                # Get AI client
-                client = self.auth_handler.get_client()
-                ai_client = AIClient(self.session_manager.get('api_key'))
-                
-                # Get conversation context
-                context = self.session_manager.get_chat_context()
-                
-                # Get current settings
-                settings = self._get_current_settings()
-                
-                # Generate suggestions
-                suggestions = ai_client.generate_suggestions(
-                    user_input=user_input,
-                    context=context,
-                    settings=settings
+        # Served instantly if a speculative prefetch already ran (or is running) for this exact request
+        job = get_prefetcher().claim(request['key'])
+        if job is not None and not (job.done() and job.result()['error']):
+            self.session_manager.adopt_job('suggestions', job)
+            return
+        
+        try:
+            self.session_manager.submit_job('suggestions', user_input, self._suggestions_job, *request['args'])
+        except JobLimitExceeded as e:
+            st.warning(f"⏳ {e}. Please wait for them to finish.")
+    
+    def _suggestions_request(self, user_input: str) -> dict:
+        """Worker arguments for suggestions on this draft, plus their prefetch key"""
+        if self.session_manager.get('all_in_one_help', False):
+            mode = 'assist'
+        elif AppConfig.is_feature_enabled('structured_suggestions'):
+            mode = 'structured'
+        else:
+            mode = 'stream'
+        
+        api_key = self.session_manager.get('api_key')
+        context = self.session_manager.get_chat_context()
+        settings = self._get_current_settings()
+        return {
+            'key': prefetch_key(api_key, user_input, context, dict(settings, mode=mode)),
+            'args': (api_key, user_input, context, settings, mode)
+        }
+    
+    def prefetch_suggestions(self):
+        """Speculatively start suggestions for the draft so a later Get Help is instant
+        
+        Runs once the draft has been idle for `idle_delay` seconds, or right
+        away after a message is received. Skipped while suggestions for the
+        same request are already shown or being generated.
+        """
+        prefetch_config = AppConfig.PREFETCH_CONFIG
+        prefetch_now = self.session_manager.get('prefetch_now', False)
+        self.session_manager.set('prefetch_now', False)
+        
+        user_input = self.session_manager.get('current_draft', '').strip()
+        if (not prefetch_config['enabled'] or not self.auth_handler.is_authenticated()
+                or len(user_input) < prefetch_config['min_chars']
+                or self.session_manager.get_job('suggestions') is not None):
+            return
+        
+        request = self._suggestions_request(user_input)
+        if request['key'] == self.session_manager.get('suggestions_key'):
+            return
+        
+        get_prefetcher().schedule(
+            self.session_manager.get_session_id(),
+            request['key'],
+            user_input,
+            request['args'][0],
+            0 if prefetch_now else prefetch_config['idle_delay'],
+            self._suggestions_job,
+            *request['args']
+        )
+    
+    @staticmethod
+    def _suggestions_job(job: Job, api_key: str, user_input: str, context: str, settings: dict, mode: str) -> dict:
+        """Worker: produce suggestions (never touches session state)"""
+        ai_client = AIClient(api_key)
+        result = {'text': "", 'items': [], 'mood': None, 'ttft': None, 'error': None}
+        
+        try:
+            if mode == 'assist':
+                # Corrected draft, options and mood in one request
+                assistance = ai_client.assist(user_input=user_input, context=context, settings=settings)
+                result['items'] = assistance.suggestions
+                result['mood'] = assistance.mood_analysis()
+            elif mode == 'structured':
+                result['items'] = ai_client.generate_structured_suggestions(
+                    user_input=user_input, context=context, settings=settings
                 )
-                
-                # Store suggestions
-                self.session_manager.set('suggestions', suggestions)
-                self.session_manager.set('loading', False)
-                
-                # Reset the flag
-                self.session_manager.set('generate_suggestions', False)
-                
+            else:
+                # Streamed; partial text is published through job.progress
+                for delta in ai_client.stream_suggestions(user_input=user_input, context=context, settings=settings):
+                    if job.cancelled:
+                        break
+                    job.progress += delta
+                result['text'] = job.progress.strip()
+                result['items'] = parse_suggestions(result['text'])
+                result['ttft'] = ai_client.last_stream_stats.get('ttft')
+        except Exception as e:
+            result['error'] = ai_client._handle_error(e)
+        
+        return result
+    
+    def _collect_suggestions(self) -> bool:
+        """Show a running suggestions job, or store its finished result; True while still running"""
+        job = self.session_manager.get_job('suggestions')
+        if job is None:
+            return False
+        
+        if not job.done():
+            self._render_job_progress(job, "🤖 Generating smart suggestions...")
+            return True
+        
+        self.session_manager.pop_job('suggestions')
+        result = job.result()
+        if result['error']:
+            st.error(result['error'])
+        self.session_manager.update({
+            'suggestions': result['text'],
+            'suggestion_items': result['items'],
+            'assist_mood': result['mood']
+        })
+        if result['ttft'] is not None:
+            self.session_manager.set('last_ttft', result['ttft'])
+        return False
+    
+    def _render_job_progress(self, job: Job, message: str) -> None:
+        """Show a running job's progress; a polling fragment reruns the app once it finishes"""
+        @st.fragment(run_every=AppConfig.JOB_CONFIG['poll_interval'])
+        def poll_job():
+            if job.done():
                 st.rerun()
-                
-            except Exception as e:
-                self.session_manager.set('loading', False)
-                st.error(f"❌ Failed to generate suggestions: {str(e)}")
+            st.markdown(job.progress + " ▌" if job.progress else message)
+        
+        poll_job()
+    
+    def _record_stream_stats(self, ai_client: AIClient):
+        """Keep time-to-first-token of the last stream in session state"""
+        ttft = ai_client.last_stream_stats.get('ttft')
+        if ttft is not None:
+            self.session_manager.set('last_ttft', ttft)
     
     def auto_fix_grammar(self):
-        """Auto-fix grammar and style"""
+        """Start an auto-fix of grammar and style in the background"""
         if not self.auth_handler.is_authenticated():
             st.error("Please configure your API key first!")
             return
@@ -68,75 +172,98 @@ class SuggestionsEngine:
             st.warning("Please type a message first!")
             return
         
-        with st.spinner("✨ Fixing grammar and style..."):
-            try:
-                ai_client = AIClient(self.session_manager.get('api_key'))
-                settings = self._get_current_settings()
-                
-                # Simple grammar fix request
-                fixed_text = ai_client.fix_grammar(user_input, settings)
-                
-                if fixed_text and fixed_text != user_input:
-                    # Update the draft with fixed text
-                    self.session_manager.set('current_draft', fixed_text)
-                    st.success(f"✅ Fixed: '{fixed_text}'")
-                else:
-                    st.info("✨ Your message looks good already!")
-                
-                # Reset the flag
-                self.session_manager.set('auto_fix_request', False)
-                
-                time.sleep(2)
-                st.rerun()
-                
-            except Exception as e:
-                self.session_manager.set('auto_fix_request', False)
-                st.error(f"❌ Auto-fix failed: {str(e)}")
-                # Try a simple fallback
-                st.info("💡 Tip: Try using 'Get Help' for suggestions instead!")
+        self.session_manager.set('auto_fix_request', False)
+        try:
+            self.session_manager.submit_job(
+                'auto_fix', user_input, self._auto_fix_job,
+                self.session_manager.get('api_key'),
+                user_input,
+                self._get_current_settings()
+            )
+        except JobLimitExceeded as e:
+            st.warning(f"⏳ {e}. Please wait for them to finish.")
+    
+    @staticmethod
+    def _auto_fix_job(job: Job, api_key: str, text: str, settings: dict) -> str:
+        """Worker: fix grammar of the draft"""
+        return AIClient(api_key).fix_grammar(text, settings)
+    
+    def _collect_auto_fix(self):
+        """Apply a finished auto-fix to the draft it was started for"""
+        job = self.session_manager.get_job('auto_fix')
+        if job is None:
+            return
+        
+        if not job.done():
+            self._render_job_progress(job, "✨ Fixing grammar and style...")
+            return
+        
+        self.session_manager.pop_job('auto_fix')
+        try:
+            fixed_text = job.result()
+        except Exception as e:
+            st.error(f"❌ Auto-fix failed: {str(e)}")
+            # Try a simple fallback
+            st.info("💡 Tip: Try using 'Get Help' for suggestions instead!")
+            return
+        
+        if fixed_text and fixed_text != job.key:
+            # Update the draft with fixed text
+            self.session_manager.set('current_draft', fixed_text)
+            self.session_manager.notify(f"Fixed: '{fixed_text}'", icon="✅")
+        else:
+            self.session_manager.notify("Your message looks good already!", icon="✨")
+        
+        # The compose box was already drawn with the old draft
+        st.rerun()
     
     def render_suggestions(self):
         """Render the suggestions display area"""
         suggestions = self.session_manager.get('suggestions', '')
+        items = self.session_manager.get('suggestion_items')
+        pending = self.session_manager.get_job('suggestions') is not None
         
-        if not suggestions:
+        if not suggestions and not items and not pending:
             return
         
         st.markdown('<div class="suggestions-container">', unsafe_allow_html=True)
         st.markdown('<h3 style="margin: 0 0 15px 0; color: #667eea;">💡 AI Suggestions</h3>', unsafe_allow_html=True)
         
-        # Parse and display suggestions
-        self._render_parsed_suggestions(suggestions)
+        if pending:
+            if self._collect_suggestions():
+                st.markdown("</div>", unsafe_allow_html=True)
+                return
+            suggestions = self.session_manager.get('suggestions', '')
+            items = self.session_manager.get('suggestion_items')
+        elif items is None:
+            # Free-text suggestions (e.g. from Full Check) are parsed once, then reused
+            items = parse_suggestions(suggestions)
+            self.session_manager.set('suggestion_items', items)
+        
+        ttft = self.session_manager.get('last_ttft')
+        if ttft is not None:
+            st.caption(f"⚡ First token in {ttft * 1000:.0f} ms")
+        
+        if items:
+            for count, item in enumerate(items, start=1):
+                self._render_suggestion_item(item.label, item.text, count)
+            
+            assist_mood = self.session_manager.get('assist_mood')
+            if assist_mood:
+                self._render_mood_display(assist_mood)
+        elif suggestions:
+            # Nothing parseable (usually an error message); show it as-is
+            st.markdown(suggestions)
         
         # Clear suggestions button
         col1, col2, col3 = st.columns([1, 1, 1])
         with col2:
             if st.button("✨ Clear Suggestions", key="clear_suggestions_btn", type="secondary"):
-                self.session_manager.set('suggestions', "")
+                self.session_manager.clear_suggestions()
                 st.rerun()
         
         st.markdown("</div>", unsafe_allow_html=True)
     
-    def _render_parsed_suggestions(self, suggestions_text: str):
-        """Parse and render individual suggestions"""
-        lines = suggestions_text.split('\n')
-        suggestion_count = 0
-        
-        for line in lines:
-            if line.strip() and ('**' in line or 'Improved:' in line or 'Option' in line):
-                # Clean up the line and extract content
-                clean_line = line.replace('*', '').replace('<strong>', '').replace('</strong>', '').strip()
-                
-                if ':' in clean_line:
-                    parts = clean_line.split(':', 1)
-                    if len(parts) == 2:
-                        label = parts[0].strip()
-                        suggestion_text = parts[1].strip().strip('"').strip("'")
-                        
-                        if suggestion_text and len(suggestion_text) > 3:
-                            suggestion_count += 1
-                            self._render_suggestion_item(label, suggestion_text, suggestion_count)
-    
     def _render_suggestion_item(self, label: str, suggestion_text: str, count: int):
         """Render a single suggestion item"""
         # Clean up any remaining HTML tags or markdown
@@ -161,33 +288,27 @@ class SuggestionsEngine:
         with col2:
             if st.button("📋 Use", key=f"use_suggestion_{count}"):
                 self.session_manager.set('current_draft', clean_text)
-                self.session_manager.set('suggestions', "")  # Clear suggestions
-                st.success(f"✅ Using: {clean_text[:30]}...")
-                time.sleep(1)
+                self.session_manager.clear_suggestions()
+                self.session_manager.notify(f"Using: {clean_text[:30]}...", icon="✅")
                 st.rerun()
         
         st.markdown('</div>', unsafe_allow_html=True)
     
     def _get_current_settings(self) -> dict:
         """Get current user settings for AI generation"""
-        return {
-            'style': self.session_manager.get('chat_style', '💬 Casual'),
-            'length': self.session_manager.get('reply_length', '📄 Medium'),
-            'model': self.session_manager.get('ai_model', '🎯 Balanced'),
-            'temperature': self.session_manager.get('temperature', 0.7),
-            'max_tokens': self.session_manager.get('max_tokens', 400)
-        }
+        return self.session_manager.get_ai_settings()
     
     def analyze_conversation_mood(self):
         """Analyze and display conversation mood"""
-        chat_history = self.session_manager.get('chat_history', [])
+        chat_history = self.session_manager.get_chat_history()
         
         if not chat_history or not self.auth_handler.is_authenticated():
             return
         
         try:
             ai_client = AIClient(self.session_manager.get('api_key'))
-            mood_analysis = ai_client.analyze_conversation_mood(chat_history)
+            summary, _ = self.session_manager.get_conversation_summary().snapshot()
+            mood_analysis = ai_client.analyze_conversation_mood(chat_history.tail(5), summary=summary)
             
             if mood_analysis and 'mood' in mood_analysis:
                 self._render_mood_display(mood_analysis)
@@ -225,15 +346,12 @@ class SuggestionsEngine:
         try:
             ai_client = AIClient(self.session_manager.get('api_key'))
             
-            prompt = f"""Based on this conversation context, suggest 3 brief, natural responses (each under 10 words):
-            
-            Context: {context or "Casual conversation"}
-            
-            Format as simple lines without numbering or formatting."""
+            prompt = render_prompt('quick_responses', context=context or "Casual conversation")
             
             response = ai_client.generate_chat_response(
                 message=prompt,
-                settings={'model': '⚡ Fast', 'style': '💬 Casual', 'length': '📝 Short'}
+                settings={'model': '⚡ Fast', 'style': '💬 Casual', 'length': '📝 Short'},
+                cache_task='quick_responses'
             )
             
             # Parse responses
@@ -249,6 +367,9 @@ class SuggestionsEngine:
     
     def handle_actions(self):
         """Handle all suggestion-related actions"""
+        # Results for an older draft no longer apply
+        self.session_manager.cancel_stale_jobs(self.session_manager.get('current_draft', '').strip())
+        
         # Check for pending actions
         if self.session_manager.get('generate_suggestions', False):
             self.generate_suggestions()
@@ -258,6 +379,11 @@ class SuggestionsEngine:
             
         # Reset action flags after processing
         self.session_manager.reset_action_flags()
+        
+        # Show or apply a background auto-fix
+        self._collect_auto_fix()
+        
+        self.prefetch_suggestions()
     
     def render_writing_assistance(self):
         """Render writing assistance tools"""
@@ -283,6 +409,126 @@ class SuggestionsEngine:
                     # Alternative versions
                     if st.button("🔄 Rephrase"):
                         self._generate_rephrase(current_draft)
+                
+                # Grammar, suggestions and mood in one concurrent round
+                if st.button("🧰 Full Check", key="full_check_btn"):
+                    self._run_full_check(current_draft)
+                
+                self._render_request_estimate(current_draft)
+    
+    def _render_request_estimate(self, text: str):
+        """Show what a Get Help request for the draft should cost before it is sent"""
+        if not self.auth_handler.is_authenticated():
+            return
+        try:
+            estimate = estimate_suggestions(
+                text.strip(),
+                self.session_manager.get_chat_context(),
+                self._get_current_settings()
+            )
+        except Exception:
+            return
+        st.caption(f"🧮 Get Help estimate ({estimate.model}): {estimate.describe()}")
+    
+    def render_bulk_grammar_fix(self):
+        """Render the bulk "fix all" upload for many texts at once"""
+        with st.expander("📚 Bulk Grammar Fix"):
+            uploaded = st.file_uploader(
+                "Upload texts: .txt (one per line) or .json (a list of strings)",
+                type=['txt', 'json'],
+                key="bulk_grammar_upload"
+            )
+            
+            job = self.session_manager.get_job('bulk_grammar')
+            if job is not None:
+                self._collect_bulk_grammar_fix(job)
+            elif uploaded is not None and st.button("✨ Fix All", key="bulk_fix_btn"):
+                self._start_bulk_grammar_fix(uploaded)
+            
+            result = self.session_manager.get('bulk_grammar_result')
+            if result:
+                self._render_bulk_grammar_result(result)
+    
+    @staticmethod
+    def _read_bulk_texts(uploaded) -> list:
+        """Read texts from an uploaded .txt or .json file"""
+        content = uploaded.getvalue().decode('utf-8')
+        if uploaded.name.lower().endswith('.json'):
+            texts = json.loads(content)
+            if not isinstance(texts, list):
+                raise ValueError("JSON upload must be a list of strings")
+            return [str(text) for text in texts]
+        return [line for line in content.splitlines() if line.strip()]
+    
+    def _start_bulk_grammar_fix(self, uploaded):
+        """Start fixing every uploaded text in the background"""
+        try:
+            texts = self._read_bulk_texts(uploaded)
+        except (UnicodeDecodeError, ValueError) as e:
+            st.error(f"❌ Couldn't read {uploaded.name}: {str(e)}")
+            return
+        
+        if not texts:
+            st.warning("The file has no texts to fix.")
+            return
+        
+        self.session_manager.set('bulk_grammar_result', None)
+        try:
+            # key None: not tied to the draft, so editing it doesn't cancel the job
+            self.session_manager.submit_job(
+                'bulk_grammar', None, self._bulk_grammar_job,
+                self.session_manager.get('api_key'),
+                texts,
+                self._get_current_settings()
+            )
+        except JobLimitExceeded as e:
+            st.warning(f"⏳ {e}. Please wait for them to finish.")
+            return
+        st.rerun()
+    
+    @staticmethod
+    def _bulk_grammar_job(job: Job, api_key: str, texts: list, settings: dict) -> dict:
+        """Worker: fix grammar of many texts in packed batches"""
+        def progress(done: int, total: int):
+            job.progress = f"📚 Fixed {done}/{total} unique texts..."
+        
+        ai_client = AIClient(api_key)
+        fixed = ai_client.fix_grammar_batch(texts, settings, progress=progress)
+        return {'texts': texts, 'fixed': fixed, 'stats': ai_client.last_batch_stats}
+    
+    def _collect_bulk_grammar_fix(self, job: Job):
+        """Store a finished bulk fix in session state"""
+        if not job.done():
+            self._render_job_progress(job, "📚 Fixing all texts...")
+            return
+        
+        self.session_manager.pop_job('bulk_grammar')
+        try:
+            self.session_manager.set('bulk_grammar_result', job.result())
+        except Exception as e:
+            st.error(f"❌ Bulk fix failed: {str(e)}")
+    
+    def _render_bulk_grammar_result(self, result: dict):
+        """Show original and fixed texts side by side with a download"""
+        stats = result['stats']
+        st.caption(
+            f"Fixed {stats['texts']} texts ({stats['unique']} unique, {stats['cached']} cached) "
+            f"in {stats['elapsed']:.1f}s · {stats['texts_per_sec']:.1f} texts/sec · "
+            f"{stats['requests']} requests, {stats['fallbacks']} retried singly"
+        )
+        if stats.get('error'):
+            st.warning(f"{stats['unfixed']} texts were left unchanged: {stats['error']}")
+        st.dataframe(
+            [{"Original": original, "Fixed": fixed} for original, fixed in zip(result['texts'], result['fixed'])],
+            use_container_width=True
+        )
+        st.download_button(
+            "📥 Download fixed texts",
+            data=json.dumps(result['fixed'], ensure_ascii=False, indent=2),
+            file_name="fixed_texts.json",
+            mime="application/json",
+            key="bulk_fix_download"
+        )
     
     def _analyze_text_tone(self, text: str):
         """Analyze the tone of the text"""
@@ -291,7 +537,8 @@ class SuggestionsEngine:
             
             analysis = ai_client.generate_chat_response(
                 message=f"Analyze the tone of this text in one word: '{text}'",
-                settings={'model': '⚡ Fast', 'style': '💬 Casual', 'length': '📝 Short'}
+                settings={'model': '⚡ Fast', 'style': '💬 Casual', 'length': '📝 Short'},
+                cache_task='tone'
             )
             
             st.info(f"🎭 Detected tone: {analysis}")
@@ -305,16 +552,48 @@ class SuggestionsEngine:
             ai_client = AIClient(self.session_manager.get('api_key'))
             settings = self._get_current_settings()
             
-            rephrased = ai_client.generate_chat_response(
+            placeholder = st.empty()
+            rephrased = ""
+            for delta in ai_client.stream_chat_response(
                 message=f"Rephrase this message in a different way while keeping the same meaning: '{text}'",
-                settings=settings
-            )
+                settings=settings,
+                task='rephrase'
+            ):
+                rephrased += delta
+                placeholder.write(f"**Alternative:** {rephrased} ▌")
+            
+            rephrased = rephrased.strip()
+            self._record_stream_stats(ai_client)
+            placeholder.write(f"**Alternative:** {rephrased}")
             
             if st.button("📋 Use Rephrased Version"):
                 self.session_manager.set('current_draft', rephrased)
                 st.rerun()
             
-            st.write(f"**Alternative:** {rephrased}")
+        except Exception as e:
+            st.error("Failed to generate rephrase")
+    
+    def _run_full_check(self, text: str):
+        """Fix grammar, suggest replies and read the mood concurrently"""
+        try:
+            with st.spinner("🧰 Checking grammar, suggestions and mood..."):
+                result = get_help(
+                    self.session_manager.get('api_key'),
+                    user_input=text,
+                    context=self.session_manager.get_chat_context(),
+                    messages=self.session_manager.get_chat_history().tail(5),
+                    settings=self._get_current_settings(),
+                    summary=self.session_manager.get_conversation_summary().snapshot()[0]
+                )
+            
+            if result['fixed_text'] and result['fixed_text'] != text:
+                st.write(f"**✨ Fixed:** {result['fixed_text']}")
+            else:
+                st.write("**✨ Grammar:** Your message looks good already!")
+            
+            self.session_manager.set('suggestions', result['suggestions'])
+            self.session_manager.set('suggestion_items', None)
+            self._render_mood_display(result['mood'])
             
         except Exception as e:
-            st.error("Failed to generate rephrase")
\ No newline at end of file
+            st.error("Failed to run full check")
\ No newline at end of file
@@ -1,5 +1,6 @@
 import streamlit as st
-from styles.themes import get_theme_css
+from config.settings import AppConfig
+from styles.themes import THEME_COLORS, get_theme_css
 
 class ThemeManager:
     """Manages application themes and styling"""
@@ -8,8 +9,14 @@ class ThemeManager:
         self.current_theme = "dark" if st.session_state.get('dark_mode', False) else "light"
     
     def apply_theme(self):
-        """Apply the current theme CSS"""
-        css = get_theme_css(self.current_theme)
+        """Apply the current theme CSS
+        
+        Streamlit drops elements that are not re-emitted on a rerun, so the
+        stylesheet is sent every time; it is built once per process and is
+        byte-identical between reruns, so the frontend leaves it untouched
+        until the theme actually changes.
+        """
+        css = get_theme_css(self.current_theme, AppConfig.THEME_CONFIG['font_source'])
         st.markdown(css, unsafe_allow_html=True)
     
     def toggle_theme(self):
@@ -37,29 +44,4 @@ class ThemeManager:
     
     def get_theme_colors(self):
         """Get current theme color palette"""
-        if self.current_theme == "dark":
-            return {
-                'bg_color': "#1a1a1a",
-                'card_bg': "#2d2d2d",
-                'text_color': "#ffffff",
-                'secondary_text': "#b0b0b0",
-                'input_bg': "#3a3a3a",
-                'gradient_start': "#667eea",
-                'gradient_end': "#764ba2",
-                'chat_bubble_user': "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
-                'chat_bubble_other': "#3a3a3a",
-                'shadow': "0 8px 32px rgba(0, 0, 0, 0.3)"
-            }
-        else:
-            return {
-                'bg_color': "#f8fafc",
-                'card_bg': "#ffffff",
-                'text_color': "#1a202c",
-                'secondary_text': "#4a5568",
-                'input_bg': "#ffffff",
-                'gradient_start': "#667eea",
-                'gradient_end': "#764ba2",
-                'chat_bubble_user': "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
-                'chat_bubble_other': "#f7fafc",
-                'shadow': "0 8px 32px rgba(31, 38, 135, 0.15)"
-            }
\ No newline at end of file
+        return dict(THEME_COLORS[self.current_theme])
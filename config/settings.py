@@ -1,3 +1,6 @@
+import os
+
+
 class AppConfig:
     """Application configuration and constants"""
     
@@ -47,6 +50,126 @@ class AppConfig:
         "🎯 Balanced": "llama-3.1-8b-instant"
     }
     
+    # Model details shown in the UI (model ids and context windows come
+    # from MODEL_MAPPINGS via the model catalog)
+    MODEL_INFO = {
+        "⚡ Fast": {
+            "description": "Fastest responses, good for quick interactions",
+            "speed": "⚡⚡⚡",
+            "quality": "⭐⭐"
+        },
+        "🧠 Smart": {
+            "description": "Highest quality responses, best for complex tasks",
+            "speed": "⚡",
+            "quality": "⭐⭐⭐"
+        },
+        "🎯 Balanced": {
+            "description": "Picks the fastest model that meets the latency target; long drafts go to Smart",
+            "speed": "⚡⚡",
+            "quality": "⭐⭐"
+        }
+    }
+    
+    # Chat context budgeting (share of the model window spent on history;
+    # default_window is used for models the catalog does not know)
+    CONTEXT_CONFIG = {
+        'budget_ratio': 0.5,
+        'reserve_tokens': 512,
+        'default_window': 8192,
+        'max_window_messages': 20
+    }
+    
+    # Rolling summary of older turns so prompts stay constant-size
+    SUMMARY_CONFIG = {
+        'enabled': True,
+        'every_messages': 10,
+        'keep_recent': 6,
+        'model': "⚡ Fast",
+        'max_tokens': 200,
+        'max_fold_messages': 50
+    }
+    
+    # Background auto-correct of the compose draft (seconds for debounce/poll)
+    AUTOCORRECT_CONFIG = {
+        'debounce': 0.8,
+        'min_chars': 10,
+        'cache_size': 256,
+        'poll_interval': 1.0
+    }
+    
+    # Background AI jobs (shared thread pool; poll_interval in seconds)
+    JOB_CONFIG = {
+        'max_workers': 8,
+        'max_jobs_per_session': 2,
+        'poll_interval': 0.5
+    }
+    
+    # Speculative suggestions prefetch (seconds; budget is per API key)
+    PREFETCH_CONFIG = {
+        'enabled': True,
+        'idle_delay': 1.5,
+        'min_chars': 10,
+        'ttl': 300,
+        'max_entries': 256,
+        'budget_per_minute': 6,
+        'max_workers': 4
+    }
+    
+    # Persistent conversation storage ('sqlite', 'jsonl' or 'memory'). Stored
+    # conversations are keyed by API key plus the URL's conversation id and
+    # deleted once untouched for retention_days (checked every purge_interval seconds)
+    STORAGE_CONFIG = {
+        'backend': 'sqlite',
+        'sqlite_path': '.data/conversations.sqlite3',
+        'jsonl_dir': '.data/conversations',
+        'batch_size': 20,
+        'flush_interval': 2.0,
+        'max_resident_messages': 200,
+        'page_size': 50,
+        'retention_days': 30,
+        'purge_interval': 3600
+    }
+    
+    # Models to fall back to, in order, when a model keeps failing
+    MODEL_FALLBACKS = {
+        "llama-3.1-70b-versatile": ["llama-3.3-70b-versatile", "llama-3.1-8b-instant"]
+    }
+    
+    # AI call metrics (FEATURES['analytics']). Both outputs are opt-in: `serve`
+    # exposes /metrics on host:port, `admin_panel` shows the in-app panel
+    # to every user of this deployment
+    METRICS_CONFIG = {
+        'serve': False,
+        'admin_panel': False,
+        'host': "127.0.0.1",
+        'port': 9464,
+        'buckets': [0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 30.0]
+    }
+    
+    # Prices in USD per million tokens, by model id (for request estimates)
+    MODEL_PRICING = {
+        "llama-3.1-8b-instant": {'input': 0.05, 'output': 0.08},
+        "llama-3.1-70b-versatile": {'input': 0.59, 'output': 0.79},
+        "llama-3.3-70b-versatile": {'input': 0.59, 'output': 0.79}
+    }
+    
+    # Right-sized max_tokens per task: base + input_ratio * input tokens
+    # + replies * reply_tokens[length], capped by `cap` and the user's setting
+    OUTPUT_TOKEN_CONFIG = {
+        'reply_tokens': {"📝 Short": 40, "📄 Medium": 100, "📚 Long": 250},
+        'tasks': {
+            'chat': {'base': 16, 'input_ratio': 0.0, 'replies': 1},
+            'rephrase': {'base': 16, 'input_ratio': 1.5, 'replies': 0},
+            'suggestions': {'base': 40, 'input_ratio': 1.2, 'replies': 2},
+            'structured_suggestions': {'base': 40, 'input_ratio': 1.2, 'replies': 2},
+            'assist': {'base': 60, 'input_ratio': 1.2, 'replies': 2},
+            'grammar': {'base': 16, 'input_ratio': 1.3, 'replies': 0, 'cap': 1000},
+            'tone': {'base': 8, 'input_ratio': 0.0, 'replies': 0},
+            'quick_responses': {'base': 60, 'input_ratio': 0.0, 'replies': 0},
+            'mood': {'base': 160, 'input_ratio': 0.0, 'replies': 0}
+        }
+    }
+    
     # Default settings
     DEFAULTS = {
         'chat_style': "💬 Casual",
@@ -57,6 +180,7 @@ class AppConfig:
         'max_tokens': 400,
         'context_messages': 6,
         'auto_send_delay': 0,
+        'all_in_one_help': False,
         'dark_mode': False
     }
     
@@ -64,17 +188,106 @@ class AppConfig:
     API_CONFIG = {
         'base_url': 'https://api.groq.com/openai/v1',
         'timeout': 30,
-        'max_retries': 3,
-        'rate_limit_delay': 1.0
+        'max_retries': 3
+    }
+
+    # Retry/backoff and circuit breaker configuration (max_retries lives in API_CONFIG)
+    RETRY_CONFIG = {
+        'base_delay': 0.5,
+        'max_delay': 8.0,
+        'breaker_failure_threshold': 5,
+        'breaker_reset_timeout': 30.0
+    }
+
+    # Shared rate limiter budgets per API key and model (adapted from response headers)
+    RATE_LIMIT_CONFIG = {
+        'requests_per_minute': 30,
+        'tokens_per_minute': 6000,
+        'max_wait': 10.0
+    }
+
+    # Response cache for repeatable AI calls (backend: 'memory' or 'sqlite')
+    CACHE_CONFIG = {
+        'enabled': True,
+        'backend': 'memory',
+        'ttl': 3600,
+        'max_bytes': 8 * 1024 * 1024,
+        'sqlite_path': '.cache/responses.sqlite3'
+    }
+
+    # Connection pool configuration (shared across reruns and sessions;
+    # turn verify_tls off only behind a TLS-intercepting proxy)
+    POOL_CONFIG = {
+        'verify_tls': True,
+        'http2': True,
+        'max_connections': 20,
+        'max_keepalive_connections': 10,
+        'keepalive_expiry': 30.0,
+        'client_idle_timeout': 900,
+        'max_clients': 256
     }
     
+    # Adaptive routing for "🎯 Balanced" (latencies in seconds)
+    ROUTER_CONFIG = {
+        'enabled': True,
+        'model_key': "🎯 Balanced",
+        'candidates': ["⚡ Fast", "🧠 Smart"],  # cheapest first
+        'escalation_model_key': "🧠 Smart",
+        'escalate_tasks': ['chat', 'suggestions', 'structured_suggestions', 'assist', 'rephrase'],
+        'complex_draft_tokens': 80,
+        'latency_slo': 3.0,
+        'task_slo': {'grammar': 1.5, 'mood': 1.5, 'tone': 1.5},
+        'min_samples': 5,
+        'max_error_rate': 0.5,
+        'priors': {
+            "⚡ Fast": {'overhead': 0.3, 'prefill_tokens_per_sec': 5000, 'tokens_per_sec': 700},
+            "🧠 Smart": {'overhead': 0.6, 'prefill_tokens_per_sec': 2000, 'tokens_per_sec': 250}
+        }
+    }
+    
+    # Batched grammar fixing (token limits per completion; a batch reserves at
+    # most tpm_share of the key's tokens-per-minute budget and waits up to
+    # max_batch_wait seconds for it to refill between batches)
+    GRAMMAR_BATCH_CONFIG = {
+        'model': "⚡ Fast",
+        'max_items': 25,
+        'max_output_tokens': 4000,
+        'item_overhead_tokens': 12,
+        'tpm_share': 0.8,
+        'max_batch_wait': 60.0
+    }
+    
+    # Model catalog: live models list with a bundled offline fallback (seconds)
+    MODEL_CATALOG_CONFIG = {
+        'fallback_path': os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models.json'),
+        'ttl': 3600,
+        'retry_interval': 60,
+        'timeout': 10,
+        'latency_window': 200
+    }
+    
+    # API key validation via the models list (TTLs in seconds)
+    KEY_VALIDATION_CONFIG = {
+        'valid_ttl': 600,
+        'invalid_ttl': 60,
+        'timeout': 10,
+        'max_entries': 1024
+    }
+
     # UI Configuration
     UI_CONFIG = {
         'max_chat_height': 300,
         'message_fade_delay': 0.3,
         'typing_animation_speed': 50,
         'auto_scroll': True,
-        'mobile_breakpoint': 768
+        'mobile_breakpoint': 768,
+        'transcript_page_size': 25,
+        'initial_transcript_pages': 2
+    }
+    
+    # Theme styling; font_source is 'google', 'local' (static/fonts/) or 'system'
+    THEME_CONFIG = {
+        'font_source': 'google'
     }
     
     # Feature Flags
@@ -83,6 +296,7 @@ class AppConfig:
         'auto_translate': False,
         'conversation_memory': True,
         'analytics': False,
+        'structured_suggestions': True,
         'export_chat': True,
         'custom_themes': False
     }
@@ -179,7 +393,7 @@ class AppConfig:
     @classmethod
     def get_model_name(cls, model_key: str) -> str:
         """Get the actual model name for API calls"""
-        return cls.MODEL_MAPPINGS.get(model_key, "mixtral-8x7b-32768")
+        return cls.MODEL_MAPPINGS.get(model_key, cls.MODEL_MAPPINGS[cls.DEFAULTS['ai_model']])
     
     @classmethod
     def is_feature_enabled(cls, feature_name: str) -> bool:
@@ -1,37 +1,67 @@
-def get_theme_css(theme="light"):
-    """Generate CSS based on theme selection"""
-    
-    if theme == "dark":
-        colors = {
-            'bg_color': "#1a1a1a",
-            'card_bg': "#2d2d2d", 
-            'text_color': "#ffffff",
-            'secondary_text': "#b0b0b0",
-            'input_bg': "#3a3a3a",
-            'gradient_start': "#667eea",
-            'gradient_end': "#764ba2",
-            'chat_bubble_user': "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
-            'chat_bubble_other': "#3a3a3a",
-            'shadow': "0 8px 32px rgba(0, 0, 0, 0.3)"
-        }
-    else:
-        colors = {
-            'bg_color': "#f8fafc",
-            'card_bg': "#ffffff",
-            'text_color': "#1a202c", 
-            'secondary_text': "#4a5568",
-            'input_bg': "#ffffff",
-            'gradient_start': "#667eea",
-            'gradient_end': "#764ba2",
-            'chat_bubble_user': "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
-            'chat_bubble_other': "#f7fafc",
-            'shadow': "0 8px 32px rgba(31, 38, 135, 0.15)"
-        }
+import re
+from functools import lru_cache
 
+THEME_COLORS = {
+    'dark': {
+        'bg_color': "#1a1a1a",
+        'card_bg': "#2d2d2d",
+        'text_color': "#ffffff",
+        'secondary_text': "#b0b0b0",
+        'input_bg': "#3a3a3a",
+        'gradient_start': "#667eea",
+        'gradient_end': "#764ba2",
+        'chat_bubble_user': "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
+        'chat_bubble_other': "#3a3a3a",
+        'shadow': "0 8px 32px rgba(0, 0, 0, 0.3)"
+    },
+    'light': {
+        'bg_color': "#f8fafc",
+        'card_bg': "#ffffff",
+        'text_color': "#1a202c",
+        'secondary_text': "#4a5568",
+        'input_bg': "#ffffff",
+        'gradient_start': "#667eea",
+        'gradient_end': "#764ba2",
+        'chat_bubble_user': "linear-gradient(135deg, #667eea 0%, #764ba2 100%)",
+        'chat_bubble_other': "#f7fafc",
+        'shadow': "0 8px 32px rgba(31, 38, 135, 0.15)"
+    }
+}
+
+# How the Inter font is loaded:
+#   'google' - @import from Google Fonts (needs internet access)
+#   'local'  - bundled file served by Streamlit static serving (static/fonts/)
+#   'system' - no web font, use the system font stack
+FONT_CSS = {
+    'google': "@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');",
+    'local': (
+        "@font-face { font-family: 'Inter'; font-style: normal; font-weight: 300 700; font-display: swap; "
+        "src: url('app/static/fonts/Inter-Variable.woff2') format('woff2'); }"
+    ),
+    'system': ""
+}
+
+
+def _minify_css(css: str) -> str:
+    """Strip comments and collapse whitespace"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    return re.sub(r"\s*([{};:,>])\s*", r"\1", css).strip()
+
+
+@lru_cache(maxsize=None)
+def get_theme_css(theme="light", font_source="google"):
+    """Get the CSS for a theme, built and minified once per (theme, font) pair"""
+    colors = THEME_COLORS['dark' if theme == "dark" else 'light']
+    return _minify_css(_build_theme_css(colors, FONT_CSS.get(font_source, "")))
+
+
+def _build_theme_css(colors, font_css):
+    """Generate the full (unminified) theme stylesheet"""
+    
     return f"""
     <style>
-    /* Import modern font */
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
+    {font_css}
     
     /* Global styles */
     .stApp {{
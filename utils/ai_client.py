@@ -1,118 +1,417 @@
-import httpx
-from groq import Groq
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
+import json
 import time
 import streamlit as st
 from config.settings import AppConfig
+from utils.client_pool import get_groq_client
+from utils.key_validator import validate_api_key
+from utils.metrics import get_metrics
+from utils.model_catalog import get_model_catalog
+from utils.model_router import get_model_router
+from utils.prompt_templates import SYSTEM_TEMPLATES, build_suggestion_messages, get_system_prompt, render_prompt
+from utils.rate_limiter import RateLimitExceeded, get_rate_limiter
+from utils.response_cache import get_response_cache
+from utils.retry import RetryPolicy
+from utils.token_estimator import (
+    RequestEstimate, count_message_tokens, count_tokens, estimate_max_tokens, estimate_request, estimate_suggestions
+)
+from utils.suggestion_parser import (
+    Assistance, Suggestion, parse_assistance, parse_grammar_batch, parse_suggestions
+)
 
-class AIClient:
-    """Wrapper for Groq AI API with error handling and rate limiting"""
+class AIClientBase:
+    """Prompt building, model selection and bookkeeping shared by the sync and async clients
+    
+    Subclasses set `self.client` and implement the request methods.
+    """
     
     def __init__(self, api_key: str):
         self.api_key = api_key
         self.config = AppConfig()
-        self.http_client = httpx.Client(verify=False)
-        self.client = Groq(api_key=api_key, http_client=self.http_client)
+        self.client = None
         self.last_request_time = 0
+        self.last_stream_stats = {}
+        self.last_batch_stats = {}
+        self.last_estimate = None
+        self.rate_limiter = get_rate_limiter()
+        self.cache = get_response_cache()
+        self.retry_policy = RetryPolicy()
+        self.last_model_used = None
+        self.last_retries = 0
+        self.catalog = get_model_catalog()
+        self.catalog.ensure_fresh(api_key)
+        self.router = get_model_router()
+        self.metrics = get_metrics()
+    
+    def _resolve_model(self, model_key: str) -> str:
+        """Model id for a UI model key, skipping models missing from the catalog"""
+        return self.catalog.resolve(model_key)
+    
+    def _select_model(self, settings: Dict, task: str, messages: List[Dict], draft: str = "",
+                      max_tokens: Optional[int] = None) -> str:
+        """Model id for a request; the adaptive setting is routed per request"""
+        return self.router.select(settings, task, messages, draft, max_tokens)
+    
+    def _max_tokens(self, task: str, settings: Dict, text: str = "") -> int:
+        """Right-sized max_tokens for a task, never above the user's setting"""
+        return estimate_max_tokens(task, text, settings.get('length'), settings.get('max_tokens', 400))
+    
+    def _record_latency(self, kwargs: Dict, response, latency: float, task: str = "chat"):
+        """Feed a finished (non-streamed) request into the catalog's latency stats and the metrics"""
+        usage = getattr(response, 'usage', None)
+        self.catalog.record_latency(
+            kwargs['model'], latency,
+            getattr(usage, 'completion_tokens', None),
+            getattr(usage, 'completion_time', None)  # Groq reports decode time separately
+        )
+        self.metrics.record_request(kwargs['model'], task, latency, usage)
+    
+    def _estimate_request_tokens(self, messages: List[Dict], max_tokens: int) -> int:
+        """Token reservation for the rate limiter (estimated prompt plus the whole reply budget)"""
+        return count_message_tokens(messages) + max_tokens
+    
+    def _reserve(self, kwargs: Dict) -> tuple:
+        """Reserve shared rate limit budget; returns (wait, reserved tokens)"""
+        reserved = self._estimate_request_tokens(kwargs['messages'], kwargs.get('max_tokens', 0))
+        wait = self.rate_limiter.reserve(self.api_key, kwargs['model'], reserved)
+        return wait, reserved
+    
+    def _settle_usage(self, kwargs: Dict, response, reserved: int):
+        """Correct the token reservation with the real usage"""
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            self.rate_limiter.settle(self.api_key, kwargs['model'], reserved, usage.total_tokens)
+    
+    def _record_error(self, kwargs: Dict, error: Exception):
+        """Let the rate limiter see retry-after/x-ratelimit headers on a 429"""
+        response = getattr(error, 'response', None)
+        if response is not None:
+            self.rate_limiter.update_from_headers(self.api_key, kwargs['model'], response.headers)
     
-    def _rate_limit(self):
-        """Implement rate limiting between requests"""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        min_delay = self.config.API_CONFIG['rate_limit_delay']
+    def _cache_key(self, task: Optional[str], kwargs: Dict) -> Optional[str]:
+        """Get the response cache key for a cacheable task, or None"""
+        if not task or not self.cache.enabled:
+            return None
+        return self.cache.make_key(
+            task,
+            kwargs['model'],
+            kwargs['messages'],
+            kwargs.get('temperature'),
+            kwargs.get('max_tokens')
+        )
+    
+    def _build_system_prompt(self, style: str, length: str, task_type: str = "chat") -> str:
+        """Build system prompt based on settings and task type (memoized per combination)"""
+        return get_system_prompt(task_type if task_type in SYSTEM_TEMPLATES else "chat", style, length)
+    
+    def _build_chat_messages(self, message: str, context: str, settings: Dict) -> List[Dict]:
+        """Build the message list for a chat response"""
+        system_prompt = self._build_system_prompt(
+            settings.get('style', '💬 Casual'),
+            settings.get('length', '📄 Medium'),
+            "chat"
+        )
         
-        if time_since_last < min_delay:
-            time.sleep(min_delay - time_since_last)
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": render_prompt('chat_user', context=context, message=message)}
+        ]
+    
+    def _build_suggestion_messages(self, user_input: str, context: str, settings: Dict,
+                                   structured: bool = False) -> List[Dict]:
+        """Build the message list for draft suggestions"""
+        return build_suggestion_messages(user_input, context, settings, structured)
+    
+    def estimate_suggestions(self, user_input: str, context: str = "", settings: Dict = None) -> RequestEstimate:
+        """Estimate tokens, cost and latency of a Get Help request without sending it"""
+        if settings is None:
+            settings = self.config.DEFAULTS
+        return estimate_suggestions(user_input, context, settings)
+    
+    def _build_grammar_messages(self, text: str, style: Optional[str] = None) -> List[Dict]:
+        """Build the message list for a grammar fix, in the user's style when given"""
+        messages = [
+            {"role": "user", "content": render_prompt('grammar_fix', text=text)}
+        ]
+        if style:
+            messages.insert(0, {"role": "system", "content": get_system_prompt('grammar', style)})
+        return messages
+    
+    def _build_grammar_batch_messages(self, items: List[Dict], style: Optional[str] = None) -> List[Dict]:
+        """Build the message list for a batched grammar fix (items are {"id", "text"})"""
+        return [
+            {"role": "system", "content": get_system_prompt('grammar_batch', style or "")},
+            {"role": "user", "content": json.dumps({"items": items}, ensure_ascii=False)}
+        ]
+    
+    def _grammar_model(self, settings: Optional[Dict]) -> str:
+        """Model id for grammar fixes: the user's model when set, else the fast one"""
+        return self._resolve_model((settings or {}).get('model', self.config.GRAMMAR_BATCH_CONFIG['model']))
+    
+    def _grammar_kwargs(self, text: str, settings: Optional[Dict] = None) -> Dict:
+        """Completion arguments for a single grammar fix (also its cache identity)"""
+        return {
+            'messages': self._build_grammar_messages(text, (settings or {}).get('style')),
+            'model': self._grammar_model(settings),
+            'max_tokens': estimate_max_tokens('grammar', text),
+            'temperature': 0.1  # Low temperature for consistency
+        }
+    
+    def _build_mood_messages(self, messages: List[Dict], summary: str = "") -> List[Dict]:
+        """Build the message list for conversation mood analysis"""
+        # Build conversation context
+        context = f"Summary of earlier conversation: {summary}\n" if summary else ""
+        for msg in messages[-5:]:  # Last 5 messages
+            sender = "Friend" if msg.get('type') == 'received' else "You"
+            context += f"{sender}: {msg.get('text', '')}\n"
+        
+        return [
+            {"role": "system", "content": get_system_prompt('mood')},
+            {"role": "user", "content": render_prompt('mood_user', conversation=context)}
+        ]
+    
+    def _grammar_batch_max_tokens(self, used: int) -> int:
+        """Reply budget for a batch whose items cost `used` tokens (items are echoed back corrected)"""
+        return min(self.config.GRAMMAR_BATCH_CONFIG['max_output_tokens'], 2 * used)
+    
+    def _pack_grammar_batches(self, texts: List[str], token_limit: Optional[int] = None,
+                              settings: Optional[Dict] = None) -> List[List[int]]:
+        """Group text indexes into batches that fit the output budget, context window
+        and `token_limit` (prompt plus max_tokens, as reserved with the rate limiter)"""
+        batch_config = self.config.GRAMMAR_BATCH_CONFIG
+        window = self.catalog.context_window(self._grammar_model(settings))
+        base = count_message_tokens(self._build_grammar_batch_messages([], (settings or {}).get('style')))
+        
+        batches = []
+        current = []
+        used = 0
+        for index, text in enumerate(texts):
+            cost = count_tokens(text) + batch_config['item_overhead_tokens']
+            reservation = base + used + cost + self._grammar_batch_max_tokens(used + cost)
+            if current and (
+                len(current) >= batch_config['max_items']
+                or used + cost > batch_config['max_output_tokens']
+                or 2 * (used + cost) + self.config.CONTEXT_CONFIG['reserve_tokens'] > window
+                or (token_limit is not None and reservation > token_limit)
+            ):
+                batches.append(current)
+                current = []
+                used = 0
+            current.append(index)
+            used += cost
+        
+        if current:
+            batches.append(current)
+        return batches
+    
+    def validate_api_key(self) -> bool:
+        """Validate if the API key is working"""
+        return validate_api_key(self.api_key)
+    
+    def _handle_error(self, error: Exception) -> str:
+        """Handle and format API errors"""
+        error_str = str(error).lower()
+        
+        if "api key" in error_str or "unauthorized" in error_str:
+            return "❌ Invalid API key. Please check your key."
+        elif "rate limit" in error_str or "too many requests" in error_str:
+            return "⏱️ Rate limit reached. Please wait a moment."
+        elif "network" in error_str or "connection" in error_str:
+            return "🌐 Network error. Please check your connection."
+        elif "server" in error_str or "500" in error_str or "model" in error_str:
+            return "🚫 Server/Model error. Backup models failed too, please try again shortly."
+        else:
+            return f"❌ Error: {str(error)}"
+    
+    def get_model_info(self) -> Dict:
+        """Get information about available models, with observed latency"""
+        return {model_key: self.catalog.model_info(model_key) for model_key in self.config.AI_MODELS}
+
+
+class AIClient(AIClientBase):
+    """Wrapper for Groq AI API with error handling and rate limiting"""
+    
+    def __init__(self, api_key: str):
+        super().__init__(api_key)
+        self.client = get_groq_client(api_key)
+        self._stream_reserved = 0
+    
+    def _send_completion(self, kwargs: Dict, task: str = "chat"):
+        """Send one completion attempt through the shared rate limiter"""
+        self.last_estimate = estimate_request(kwargs['messages'], kwargs.get('max_tokens', 0), kwargs['model'])
+        wait, reserved = self._reserve(kwargs)
+        if wait > 0:
+            # Only reached when the key's shared budget is exhausted
+            time.sleep(wait)
         
         self.last_request_time = time.time()
+        start = time.perf_counter()
+        try:
+            raw_response = self.client.chat.completions.with_raw_response.create(**kwargs)
+        except Exception as e:
+            self._record_error(kwargs, e)
+            self.catalog.record_error(kwargs['model'])
+            self.metrics.record_request(kwargs['model'], task, time.perf_counter() - start, error=e)
+            raise
+        
+        response = raw_response.parse()
+        if kwargs.get('stream'):
+            # Streams report usage on their final chunk; _stream_completion settles and times them
+            self._stream_reserved = reserved
+        else:
+            # Settle first so the provider's remaining budget has the final word
+            self._settle_usage(kwargs, response, reserved)
+        self.rate_limiter.update_from_headers(self.api_key, kwargs['model'], raw_response.headers)
+        if not kwargs.get('stream'):
+            self._record_latency(kwargs, response, time.perf_counter() - start, task)
+        return response
     
-    def _build_system_prompt(self, style: str, length: str, task_type: str = "chat") -> str:
-        """Build system prompt based on settings and task type"""
-        style_text = self.config.get_style_prompt(style)
-        length_text = self.config.get_length_prompt(length)
-        
-        if task_type == "suggestions":
-            return f"""You are a helpful chat assistant. Provide natural, engaging suggestions that fit the conversation context. 
-            Style: {style_text}
-            Length: {length_text}
+    def _create_completion(self, deadline: Optional[float] = None, task: str = "chat", **kwargs):
+        """Send a chat completion with retries, backoff and model fallback (`task` labels the metrics)"""
+        state = self.retry_policy.start(kwargs['model'], deadline)
+        while True:
+            model, timeout = state.next_attempt()
+            try:
+                response = self._send_completion(dict(kwargs, model=model, timeout=timeout), task)
+            except Exception as e:
+                time.sleep(state.on_error(model, e))
+                self.metrics.record_retry(model, task)
+                continue
             
-            Always format your response as:
-            **✨ Improved:** [enhanced version]
-            **💡 Option 1:** [alternative 1] 
-            **💡 Option 2:** [alternative 2]"""
+            state.on_success(model)
+            self.last_model_used = model
+            self.last_retries = state.total_retries
+            return response
+    
+    def _complete_text(self, task: Optional[str] = None, metrics_task: Optional[str] = None, **kwargs) -> str:
+        """Get completion text, served from the response cache when `task` is set
         
-        elif task_type == "grammar":
-            return f"Fix grammar and spelling. Make it sound {style_text}. Keep the same meaning. Return only the corrected text."
+        `metrics_task` labels the metrics of uncached calls (cached ones use `task`).
+        """
+        cache_key = self._cache_key(task, kwargs)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            self.metrics.record_cache(task, cached is not None)
+            if cached is not None:
+                return cached
         
-        else:
-            return f"You are a helpful chat assistant. Respond in a {style_text} manner with {length_text} responses."
+        response = self._create_completion(task=task or metrics_task or "chat", **kwargs)
+        text = response.choices[0].message.content.strip()
+        
+        if cache_key:
+            self.cache.set(cache_key, text)
+        return text
     
-    def generate_chat_response(self, message: str, context: str = "", settings: Dict = None) -> str:
-        """Generate a chat response"""
+    def _stream_completion(self, messages: List[Dict], settings: Dict, task: str = "chat",
+                           draft: str = "") -> Iterator[str]:
+        """Stream completion text deltas, recording time-to-first-token"""
+        start = time.perf_counter()
+        first_token_at = None
+        chunks = 0
+        
+        max_tokens = self._max_tokens(task, settings, draft)
+        stream = self._create_completion(
+            task=task,
+            messages=messages,
+            model=self._select_model(settings, task, messages, draft, max_tokens),
+            max_tokens=max_tokens,
+            temperature=settings.get('temperature', 0.7),
+            stream=True
+        )
+        
+        usage = None
+        try:
+            for chunk in stream:
+                # Groq reports usage on the final chunk
+                x_groq = getattr(chunk, 'x_groq', None)
+                if getattr(x_groq, 'usage', None) is not None:
+                    usage = x_groq.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    self.last_stream_stats = {'ttft': first_token_at - start}
+                chunks += 1
+                yield delta
+        except Exception as e:
+            # Broken off mid-stream: the prompt and the chunks received so far were spent
+            self.rate_limiter.settle(
+                self.api_key, self.last_model_used, self._stream_reserved,
+                count_message_tokens(messages) + chunks
+            )
+            self.catalog.record_error(self.last_model_used)
+            self.metrics.record_request(self.last_model_used, task, time.perf_counter() - start, error=e)
+            raise
+        
+        end = time.perf_counter()
+        if usage is not None:
+            self.rate_limiter.settle(self.api_key, self.last_model_used, self._stream_reserved, usage.total_tokens)
+        self.last_stream_stats = {
+            'ttft': (first_token_at or end) - start,
+            'total_time': end - start,
+            'chunks': chunks
+        }
+        # Each content chunk carries roughly one token
+        self.catalog.record_latency(
+            self.last_model_used, end - start, chunks, end - (first_token_at or end)
+        )
+        self.metrics.record_request(
+            self.last_model_used, task, end - start, usage,
+            ttft=first_token_at - start if first_token_at is not None else None
+        )
+    
+    def generate_chat_response(self, message: str, context: str = "", settings: Dict = None,
+                               cache_task: Optional[str] = None) -> str:
+        """Generate a chat response; pass cache_task to serve repeats from the cache"""
         if settings is None:
             settings = self.config.DEFAULTS
         
+        messages = self._build_chat_messages(message, context, settings)
+        max_tokens = self._max_tokens(cache_task or 'chat', settings, message)
         try:
-            self._rate_limit()
-            
-            system_prompt = self._build_system_prompt(
-                settings.get('style', '💬 Casual'),
-                settings.get('length', '📄 Medium'),
-                "chat"
-            )
-            
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Context: {context}\nUser message: {message}"}
-            ]
-            
-            response = self.client.chat.completions.create(
+            return self._complete_text(
+                cache_task,
                 messages=messages,
-                model=self.config.get_model_name(settings.get('model', '🎯 Balanced')),
-                max_tokens=settings.get('max_tokens', 400),
+                model=self._select_model(settings, cache_task or 'chat', messages, message, max_tokens),
+                max_tokens=max_tokens,
                 temperature=settings.get('temperature', 0.7)
             )
             
-            return response.choices[0].message.content.strip()
-            
         except Exception as e:
             return self._handle_error(e)
     
+    def stream_chat_response(self, message: str, context: str = "", settings: Dict = None,
+                             task: str = "chat") -> Iterator[str]:
+        """Stream a chat response as it is generated; `task` (e.g. 'rephrase') guides model routing"""
+        if settings is None:
+            settings = self.config.DEFAULTS
+        
+        try:
+            yield from self._stream_completion(
+                self._build_chat_messages(message, context, settings),
+                settings,
+                task,
+                message
+            )
+        except Exception as e:
+            yield self._handle_error(e)
+    
     def generate_suggestions(self, user_input: str, context: str = "", settings: Dict = None) -> str:
         """Generate message suggestions"""
         if settings is None:
             settings = self.config.DEFAULTS
         
+        messages = self._build_suggestion_messages(user_input, context, settings)
+        max_tokens = self._max_tokens('suggestions', settings, user_input)
         try:
-            self._rate_limit()
-            
-            system_prompt = self._build_system_prompt(
-                settings.get('style', '💬 Casual'),
-                settings.get('length', '📄 Medium'),
-                "suggestions"
-            )
-            
-            full_context = f"""
-            Conversation context:
-            {context}
-            
-            The user is drafting: "{user_input}"
-            
-            Please provide:
-            1. An improved version of their draft (if grammar/style needs fixing)
-            2. 2 alternative reply suggestions
-            
-            Style: {self.config.get_style_prompt(settings.get('style', '💬 Casual'))}
-            Length: {self.config.get_length_prompt(settings.get('length', '📄 Medium'))}
-            """
-            
-            response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": full_context}
-                ],
-                model=self.config.get_model_name(settings.get('model', '🎯 Balanced')),
-                max_tokens=settings.get('max_tokens', 400),
+            response = self._create_completion(
+                task='suggestions',
+                messages=messages,
+                model=self._select_model(settings, 'suggestions', messages, user_input, max_tokens),
+                max_tokens=max_tokens,
                 temperature=settings.get('temperature', 0.7)
             )
             
@@ -121,61 +420,201 @@ class AIClient:
         except Exception as e:
             return self._handle_error(e)
     
+    def generate_structured_suggestions(self, user_input: str, context: str = "",
+                                        settings: Dict = None) -> List[Suggestion]:
+        """Generate suggestions in JSON mode and parse them into Suggestion records
+        
+        Falls back to the free-text parser if the model ignores the schema.
+        Raises on API errors so callers can surface them.
+        """
+        if settings is None:
+            settings = self.config.DEFAULTS
+        
+        messages = self._build_suggestion_messages(user_input, context, settings, structured=True)
+        max_tokens = self._max_tokens('structured_suggestions', settings, user_input)
+        response = self._create_completion(
+            task='structured_suggestions',
+            messages=messages,
+            model=self._select_model(settings, 'structured_suggestions', messages, user_input, max_tokens),
+            max_tokens=max_tokens,
+            temperature=settings.get('temperature', 0.7),
+            response_format={"type": "json_object"}
+        )
+        
+        return parse_suggestions(response.choices[0].message.content or "", max_options=2)
+    
+    def assist(self, user_input: str, context: str = "", settings: Dict = None,
+               options: int = 2) -> Assistance:
+        """Fix grammar, suggest replies and read the mood in a single completion
+        
+        Replaces the fix_grammar + generate_suggestions + analyze_conversation_mood
+        round trips with one request carrying one copy of the context.
+        Raises on API errors so callers can surface them.
+        """
+        if settings is None:
+            settings = self.config.DEFAULTS
+        
+        system_prompt = self._build_system_prompt(
+            settings.get('style', '💬 Casual'),
+            settings.get('length', '📄 Medium'),
+            "assist"
+        )
+        
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": render_prompt('assist_user', context=context, draft=user_input, options=options)}
+        ]
+        max_tokens = self._max_tokens('assist', settings, user_input)
+        response = self._create_completion(
+            task='assist',
+            messages=messages,
+            model=self._select_model(settings, 'assist', messages, user_input, max_tokens),
+            max_tokens=max_tokens,
+            temperature=settings.get('temperature', 0.7),
+            response_format={"type": "json_object"}
+        )
+        
+        return parse_assistance(response.choices[0].message.content or "", user_input, max_options=options)
+    
+    def stream_suggestions(self, user_input: str, context: str = "", settings: Dict = None) -> Iterator[str]:
+        """Stream message suggestions as they are generated"""
+        if settings is None:
+            settings = self.config.DEFAULTS
+        
+        try:
+            yield from self._stream_completion(
+                self._build_suggestion_messages(user_input, context, settings),
+                settings,
+                'suggestions',
+                user_input
+            )
+        except Exception as e:
+            yield self._handle_error(e)
+    
     def fix_grammar(self, text: str, settings: Dict = None) -> str:
         """Fix grammar and style of text"""
         if settings is None:
             settings = self.config.DEFAULTS
         
         try:
-            self._rate_limit()
-            
-            # Simplified grammar fix prompt
-            simple_prompt = f"Fix grammar and spelling errors in this text. Keep the same meaning and style. Only return the corrected text: {text}"
-            
-            response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "user", "content": simple_prompt}
-                ],
-                model="llama-3.1-8b-instant",  # Use fastest model
-                max_tokens=200,
-                temperature=0.1  # Low temperature for consistency
-            )
-            
-            return response.choices[0].message.content.strip()
+            return self._complete_text('grammar', **self._grammar_kwargs(text, settings))
             
         except Exception as e:
             # Return original text if fixing fails
             return text
     
-    def analyze_conversation_mood(self, messages: List[Dict], settings: Dict = None) -> Dict:
-        """Analyze the mood/tone of conversation"""
-        if not messages or settings is None:
-            return {"mood": "neutral", "confidence": 0.5, "suggestions": []}
+    def fix_grammar_batch(self, texts: List[str], settings: Dict = None,
+                          progress: Optional[Callable[[int, int], None]] = None) -> List[str]:
+        """Fix grammar of many texts in as few completions as possible
         
-        try:
-            self._rate_limit()
+        Identical inputs are sent once and inputs already in the response
+        cache are not sent at all. The rest are packed as JSON items with ids
+        into batches that fit the key's tokens-per-minute budget, waiting for
+        it to refill between batches; any item that does not come back
+        well-formed is retried on its own with fix_grammar. Returns corrected
+        texts in input order and leaves throughput figures in
+        last_batch_stats. If a batch still fails, the texts fixed so far are
+        returned, the rest come back unchanged and the error is left in
+        last_batch_stats['error'].
+        """
+        if settings is None:
+            settings = self.config.DEFAULTS
+        
+        start = time.perf_counter()
+        unique = list(dict.fromkeys(text.strip() for text in texts if text and text.strip()))
+        batch_config = self.config.GRAMMAR_BATCH_CONFIG
+        model = self._grammar_model(settings)
+        
+        fixed = {}
+        pending = []
+        for text in unique:
+            cache_key = self._cache_key('grammar', self._grammar_kwargs(text, settings))
+            cached = None
+            if cache_key:
+                cached = self.cache.get(cache_key)
+                self.metrics.record_cache('grammar', cached is not None)
+            if cached is not None:
+                fixed[text] = cached
+            else:
+                pending.append(text)
+        
+        token_limit = int(self.rate_limiter.token_capacity(self.api_key, model) * batch_config['tpm_share'])
+        requests = 0
+        fallbacks = 0
+        error = None
+        for batch in self._pack_grammar_batches(pending, token_limit, settings):
+            items = [{"id": index, "text": pending[index]} for index in batch]
+            messages = self._build_grammar_batch_messages(items, settings.get('style'))
+            max_tokens = self._grammar_batch_max_tokens(
+                sum(count_tokens(item['text']) + batch_config['item_overhead_tokens'] for item in items)
+            )
             
-            # Build conversation context
-            context = ""
-            for msg in messages[-5:]:  # Last 5 messages
-                sender = "Friend" if msg.get('type') == 'received' else "You"
-                context += f"{sender}: {msg.get('text', '')}\n"
+            # Let the per-minute budget refill rather than fail the batch
+            wait = self.rate_limiter.wait_time(
+                self.api_key, model, self._estimate_request_tokens(messages, max_tokens)
+            )
+            if wait > batch_config['max_batch_wait']:
+                error = self._handle_error(RateLimitExceeded(wait))
+                break
+            if wait > 0:
+                time.sleep(wait)
             
-            system_prompt = """Analyze the mood and tone of this conversation. 
-            Return a JSON object with:
-            - mood: (positive/negative/neutral/excited/confused/romantic/professional)
-            - confidence: (0.0-1.0)
-            - suggestions: [list of 2-3 response suggestions that match the mood]
+            requests += 1
+            # API errors end the run; only items missing from a parsed reply are retried one by one
+            try:
+                response = self._create_completion(
+                    task='grammar_batch',
+                    messages=messages,
+                    model=model,
+                    max_tokens=max_tokens,
+                    temperature=0.1,
+                    response_format={"type": "json_object"}
+                )
+            except Exception as e:
+                error = self._handle_error(e)
+                break
+            corrected = parse_grammar_batch(response.choices[0].message.content or "", batch)
             
-            Keep suggestions brief and contextually appropriate."""
+            for index in batch:
+                text = pending[index]
+                if index in corrected:
+                    fixed[text] = corrected[index]
+                    cache_key = self._cache_key('grammar', self._grammar_kwargs(text, settings))
+                    if cache_key:
+                        self.cache.set(cache_key, corrected[index])
+                else:
+                    fixed[text] = self.fix_grammar(text, settings)
+                    requests += 1
+                    fallbacks += 1
             
-            response = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": f"Conversation:\n{context}"}
-                ],
-                model="llama-3.1-8b-instant",  # Use faster model for analysis
-                max_tokens=200,
+            if progress is not None:
+                progress(len(fixed), len(unique))
+        
+        elapsed = time.perf_counter() - start
+        self.last_batch_stats = {
+            'texts': len(texts),
+            'unique': len(unique),
+            'cached': len(unique) - len(pending),
+            'requests': requests,
+            'fallbacks': fallbacks,
+            'unfixed': len(unique) - len(fixed),
+            'error': error,
+            'elapsed': elapsed,
+            'texts_per_sec': len(texts) / elapsed if elapsed > 0 else 0.0
+        }
+        return [fixed.get(text.strip(), text) if text and text.strip() else text for text in texts]
+    
+    def analyze_conversation_mood(self, messages: List[Dict], settings: Dict = None, summary: str = "") -> Dict:
+        """Analyze the mood/tone of conversation (recent messages plus running summary)"""
+        if not messages or settings is None:
+            return {"mood": "neutral", "confidence": 0.5, "suggestions": []}
+        
+        try:
+            response = self._create_completion(
+                task='mood',
+                messages=self._build_mood_messages(messages, summary),
+                model=self._resolve_model("⚡ Fast"),  # Use faster model for analysis
+                max_tokens=estimate_max_tokens('mood'),
                 temperature=0.3
             )
             
@@ -186,60 +625,26 @@ class AIClient:
         except Exception as e:
             return {"mood": "neutral", "confidence": 0.5, "suggestions": [], "error": str(e)}
     
-    def validate_api_key(self) -> bool:
-        """Validate if the API key is working"""
-        try:
-            response = self.client.chat.completions.create(
-                messages=[{"role": "user", "content": "test"}],
-                model="llama-3.1-8b-instant",
-                max_tokens=5
-            )
-            return True
-        except Exception:
-            return False
-    
-    def _handle_error(self, error: Exception) -> str:
-        """Handle and format API errors"""
-        error_str = str(error).lower()
+    def summarize_conversation(self, summary: str, messages: List[Dict]) -> str:
+        """Fold older messages into a running conversation summary (Fast model)"""
+        summary_config = self.config.SUMMARY_CONFIG
         
-        if "api key" in error_str or "unauthorized" in error_str:
-            return "❌ Invalid API key. Please check your key."
-        elif "rate limit" in error_str or "too many requests" in error_str:
-            return "⏱️ Rate limit reached. Please wait a moment."
-        elif "network" in error_str or "connection" in error_str:
-            return "🌐 Network error. Please check your connection."
-        elif "server" in error_str or "500" in error_str or "model" in error_str:
-            return "🚫 Server/Model error. Trying backup model..."
-        else:
-            return f"❌ Error: {str(error)}"
-    
-    def get_model_info(self) -> Dict:
-        """Get information about available models"""
-        return {
-            "⚡ Fast": {
-                "name": "llama-3.1-8b-instant",
-                "description": "Fastest responses, good for quick interactions",
-                "speed": "⚡⚡⚡",
-                "quality": "⭐⭐",
-                "context": "8K tokens"
-            },
-            "🧠 Smart": {
-                "name": "llama-3.1-70b-versatile", 
-                "description": "Highest quality responses, best for complex tasks",
-                "speed": "⚡",
-                "quality": "⭐⭐⭐",
-                "context": "32K tokens"
-            },
-            "🎯 Balanced": {
-                "name": "mixtral-8x7b-32768",
-                "description": "Good balance of speed and quality",
-                "speed": "⚡⚡",
-                "quality": "⭐⭐⭐",
-                "context": "32K tokens"
-            }
-        }
+        transcript = ""
+        for msg in messages:
+            sender = "Friend" if msg.get('type') == 'received' else "You"
+            transcript += f"{sender}: {msg.get('text', '')}\n"
+        
+        return self._complete_text(
+            metrics_task='summary',
+            messages=[
+                {"role": "system", "content": get_system_prompt('summary')},
+                {"role": "user", "content": render_prompt('summary_user', summary=summary or '(none)', messages=transcript)}
+            ],
+            model=self._resolve_model(summary_config['model']),
+            max_tokens=summary_config['max_tokens'],
+            temperature=0.2
+        )
     
     def cleanup(self):
-        """Clean up resources"""
-        if hasattr(self, 'http_client'):
-            self.http_client.close()
\ No newline at end of file
+        """Release this wrapper; the pooled connection stays open for reuse"""
+        self.client = None
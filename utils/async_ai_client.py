@@ -0,0 +1,208 @@
+import asyncio
+import json
+import time
+from typing import Any, Awaitable, Dict, List, Optional
+
+import httpx
+from groq import AsyncGroq
+from utils.ai_client import AIClientBase
+from utils.token_estimator import estimate_max_tokens, estimate_request
+
+
+class AsyncAIClient(AIClientBase):
+    """Asynchronous Groq wrapper so independent AI calls can run concurrently
+
+    Shares prompt building and error handling with AIClient through
+    AIClientBase; only the methods defined here are available. An httpx
+    AsyncClient is bound to the event loop it first runs on, so use one
+    instance per asyncio.run() as an async context manager.
+    """
+
+    def __init__(self, api_key: str):
+        super().__init__(api_key)
+        pool_config = self.config.POOL_CONFIG
+        self.http_client = httpx.AsyncClient(
+            verify=pool_config['verify_tls'],
+            limits=httpx.Limits(
+                max_connections=pool_config['max_connections'],
+                max_keepalive_connections=pool_config['max_keepalive_connections'],
+                keepalive_expiry=pool_config['keepalive_expiry']
+            ),
+            timeout=self.config.API_CONFIG['timeout']
+        )
+        # Retries and fallback are handled by utils.retry
+        self.client = AsyncGroq(api_key=api_key.strip(), http_client=self.http_client, max_retries=0)
+
+    async def __aenter__(self) -> "AsyncAIClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connections"""
+        await self.http_client.aclose()
+
+    async def _send_completion(self, kwargs: Dict, task: str = "chat"):
+        """Send one completion attempt through the shared rate limiter without blocking the loop"""
+        self.last_estimate = estimate_request(kwargs['messages'], kwargs.get('max_tokens', 0), kwargs['model'])
+        wait, reserved = self._reserve(kwargs)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        self.last_request_time = time.time()
+        start = time.perf_counter()
+        try:
+            raw_response = await self.client.chat.completions.with_raw_response.create(**kwargs)
+        except Exception as e:
+            self._record_error(kwargs, e)
+            self.catalog.record_error(kwargs['model'])
+            self.metrics.record_request(kwargs['model'], task, time.perf_counter() - start, error=e)
+            raise
+
+        response = await raw_response.parse()
+        # Settle first so the provider's remaining budget has the final word
+        self._settle_usage(kwargs, response, reserved)
+        self.rate_limiter.update_from_headers(self.api_key, kwargs['model'], raw_response.headers)
+        self._record_latency(kwargs, response, time.perf_counter() - start, task)
+        return response
+
+    async def _create_completion(self, deadline: Optional[float] = None, task: str = "chat", **kwargs):
+        """Send a chat completion with retries, backoff and model fallback (`task` labels the metrics)"""
+        state = self.retry_policy.start(kwargs['model'], deadline)
+        while True:
+            model, timeout = state.next_attempt()
+            try:
+                response = await self._send_completion(dict(kwargs, model=model, timeout=timeout), task)
+            except Exception as e:
+                await asyncio.sleep(state.on_error(model, e))
+                self.metrics.record_retry(model, task)
+                continue
+
+            state.on_success(model)
+            self.last_model_used = model
+            self.last_retries = state.total_retries
+            return response
+
+    async def _complete_text(self, task: Optional[str] = None, metrics_task: Optional[str] = None, **kwargs) -> str:
+        """Get completion text, served from the response cache when `task` is set"""
+        cache_key = self._cache_key(task, kwargs)
+        if cache_key:
+            cached = self.cache.get(cache_key)
+            self.metrics.record_cache(task, cached is not None)
+            if cached is not None:
+                return cached
+
+        response = await self._create_completion(task=task or metrics_task or "chat", **kwargs)
+        text = response.choices[0].message.content.strip()
+
+        if cache_key:
+            self.cache.set(cache_key, text)
+        return text
+
+    async def generate_chat_response(self, message: str, context: str = "", settings: Dict = None,
+                                     cache_task: Optional[str] = None) -> str:
+        """Generate a chat response; pass cache_task to serve repeats from the cache"""
+        if settings is None:
+            settings = self.config.DEFAULTS
+
+        messages = self._build_chat_messages(message, context, settings)
+        max_tokens = self._max_tokens(cache_task or 'chat', settings, message)
+        try:
+            return await self._complete_text(
+                cache_task,
+                messages=messages,
+                model=self._select_model(settings, cache_task or 'chat', messages, message, max_tokens),
+                max_tokens=max_tokens,
+                temperature=settings.get('temperature', 0.7)
+            )
+
+        except Exception as e:
+            return self._handle_error(e)
+
+    async def generate_suggestions(self, user_input: str, context: str = "", settings: Dict = None) -> str:
+        """Generate message suggestions"""
+        if settings is None:
+            settings = self.config.DEFAULTS
+
+        messages = self._build_suggestion_messages(user_input, context, settings)
+        max_tokens = self._max_tokens('suggestions', settings, user_input)
+        try:
+            response = await self._create_completion(
+                task='suggestions',
+                messages=messages,
+                model=self._select_model(settings, 'suggestions', messages, user_input, max_tokens),
+                max_tokens=max_tokens,
+                temperature=settings.get('temperature', 0.7)
+            )
+
+            return response.choices[0].message.content.strip()
+
+        except Exception as e:
+            return self._handle_error(e)
+
+    async def fix_grammar(self, text: str, settings: Dict = None) -> str:
+        """Fix grammar and style of text"""
+        try:
+            return await self._complete_text('grammar', **self._grammar_kwargs(text, settings))
+
+        except Exception:
+            # Return original text if fixing fails
+            return text
+
+    async def analyze_conversation_mood(self, messages: List[Dict], settings: Dict = None,
+                                        summary: str = "") -> Dict:
+        """Analyze the mood/tone of conversation (recent messages plus running summary)"""
+        if not messages or settings is None:
+            return {"mood": "neutral", "confidence": 0.5, "suggestions": []}
+
+        try:
+            response = await self._create_completion(
+                task='mood',
+                messages=self._build_mood_messages(messages, summary),
+                model=self._resolve_model("⚡ Fast"),  # Use faster model for analysis
+                max_tokens=estimate_max_tokens('mood'),
+                temperature=0.3
+            )
+
+            return json.loads(response.choices[0].message.content.strip())
+
+        except Exception as e:
+            return {"mood": "neutral", "confidence": 0.5, "suggestions": [], "error": str(e)}
+
+    async def get_help(self, user_input: str, context: str = "", messages: List[Dict] = None,
+                       settings: Dict = None, summary: str = "") -> Dict:
+        """Fix grammar, suggest replies and read the mood in one concurrent fan-out"""
+        fixed, suggestions, mood = await asyncio.gather(
+            self.fix_grammar(user_input, settings),
+            self.generate_suggestions(user_input, context, settings),
+            self.analyze_conversation_mood(messages or [], settings, summary)
+        )
+
+        return {
+            'fixed_text': fixed,
+            'suggestions': suggestions,
+            'mood': mood
+        }
+
+
+def run_concurrently(*awaitables: Awaitable) -> List[Any]:
+    """Run independent awaitables concurrently from synchronous code
+
+    Results are returned in argument order. Must not be called from inside a
+    running event loop.
+    """
+    async def _gather():
+        return await asyncio.gather(*awaitables)
+
+    return asyncio.run(_gather())
+
+
+def get_help(api_key: str, user_input: str, context: str = "", messages: List[Dict] = None,
+             settings: Dict = None, summary: str = "") -> Dict:
+    """Run a compound Get Help request from synchronous (Streamlit) code"""
+    async def _run():
+        async with AsyncAIClient(api_key) as client:
+            return await client.get_help(user_input, context, messages, settings, summary)
+
+    return asyncio.run(_run())
@@ -0,0 +1,174 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from config.settings import AppConfig
+from utils.job_manager import Job, JobLimitExceeded, get_job_manager
+
+# A sentence runs up to its terminal punctuation (or the end of the text);
+# trailing whitespace stays attached so the pieces join back losslessly.
+_SENTENCE = re.compile(r"[^.!?\n]*(?:[.!?]+|\n|$)\s*")
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split text into sentences such that "".join(result) == text"""
+    return [sentence for sentence in _SENTENCE.findall(text) if sentence]
+
+
+class AutoCorrector:
+    """Debounced background grammar checking of the compose draft
+
+    Lives in session state. Each submitted draft bumps a generation
+    counter; a job on the shared JobManager (counted against the session's
+    cap) waits out the debounce delay and gives up as soon as a newer
+    draft arrives, so stale work is dropped between requests. Only
+    sentences that are not in the per-session sentence cache are sent, all
+    in one fix_grammar_batch request, so editing one sentence re-checks
+    just that one.
+    """
+
+    def __init__(self):
+        self.config = AppConfig.AUTOCORRECT_CONFIG
+        self.in_flight = False
+        self.last_error = None
+        self._generation = 0
+        self._draft = None
+        self._job: Optional[Job] = None
+        self._result = None  # (draft, corrected)
+        self._sentences = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        state['_job'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def submit(self, draft: str, api_key: str, session_id: str, settings: Optional[Dict] = None) -> bool:
+        """Schedule a check of `draft` unless it is unchanged, too short or the session is at its job cap"""
+        with self._lock:
+            if draft == self._draft:
+                return False
+            self._draft = draft
+            self._generation += 1
+            generation = self._generation
+            previous, self._job = self._job, None
+            if not api_key or len(draft.strip()) < self.config['min_chars']:
+                self.in_flight = False
+                return False
+            self.in_flight = True
+
+        if previous is not None:
+            previous.cancel()
+        try:
+            job = get_job_manager().submit(
+                session_id, 'autocorrect', draft, self._run, generation, draft, api_key, settings
+            )
+        except JobLimitExceeded:
+            with self._lock:
+                if generation == self._generation:
+                    # Try again on a later rerun, once a slot is free
+                    self._draft = None
+                    self.in_flight = False
+            return False
+
+        with self._lock:
+            if generation == self._generation:
+                self._job = job
+        return True
+
+    def cancel(self) -> None:
+        """Drop any in-flight check and pending result"""
+        with self._lock:
+            self._generation += 1
+            self._draft = None
+            self._result = None
+            self.in_flight = False
+            job, self._job = self._job, None
+        if job is not None:
+            job.cancel()
+
+    def result_for(self, draft: str) -> Optional[str]:
+        """Get the corrected text if it was computed for exactly this draft"""
+        with self._lock:
+            if self._result is None or self._result[0] != draft:
+                return None
+            corrected = self._result[1]
+        return corrected if corrected != draft else None
+
+    def _is_stale(self, generation: int) -> bool:
+        with self._lock:
+            return generation != self._generation
+
+    def _cached(self, sentence: str) -> Optional[str]:
+        with self._lock:
+            fixed = self._sentences.get(sentence)
+            if fixed is not None:
+                self._sentences.move_to_end(sentence)
+            return fixed
+
+    def _remember(self, sentence: str, fixed: str) -> None:
+        with self._lock:
+            self._sentences[sentence] = fixed
+            # A corrected sentence is already correct; don't re-check it after it is applied
+            self._sentences[fixed] = fixed
+            while len(self._sentences) > self.config['cache_size']:
+                self._sentences.popitem(last=False)
+
+    def _run(self, job: Job, generation: int, draft: str, api_key: str, settings: Optional[Dict]) -> None:
+        from utils.ai_client import AIClient
+
+        time.sleep(self.config['debounce'])
+        if self._is_stale(generation):
+            return
+
+        sentences = split_sentences(draft)
+        fixes = {}
+        for sentence in sentences:
+            core = sentence.strip()
+            if core and core not in fixes:
+                fixes[core] = self._cached(core)
+        missing = [core for core, fixed in fixes.items() if fixed is None]
+
+        try:
+            if missing:
+                if self._is_stale(generation):
+                    return
+                # Every unchecked sentence goes out in one batched request
+                client = AIClient(api_key)
+                corrected = client.fix_grammar_batch(missing, settings)
+                if client.last_batch_stats.get('error'):
+                    # Unchecked sentences came back unchanged; don't cache them as correct
+                    raise RuntimeError(client.last_batch_stats['error'])
+                for core, fixed in zip(missing, corrected):
+                    fixed = fixed.strip() or core
+                    self._remember(core, fixed)
+                    fixes[core] = fixed
+        except Exception as e:
+            with self._lock:
+                if generation == self._generation:
+                    self.in_flight = False
+                    self.last_error = str(e)
+            return
+
+        pieces = []
+        for sentence in sentences:
+            core = sentence.strip()
+            if not core:
+                pieces.append(sentence)
+                continue
+            leading = sentence[:len(sentence) - len(sentence.lstrip())]
+            trailing = sentence[len(sentence.rstrip()):]
+            pieces.append(leading + fixes[core] + trailing)
+
+        with self._lock:
+            if generation == self._generation:
+                self._result = (draft, "".join(pieces))
+                self.in_flight = False
+                self.last_error = None
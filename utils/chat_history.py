@@ -0,0 +1,242 @@
+import struct
+import time
+import zlib
+from array import array
+from typing import Dict, Iterator, Optional, Union
+
+SENT = 'sent'
+RECEIVED = 'received'
+
+# Message types are stored as one byte each
+_TYPE_CODES = {SENT: 0, RECEIVED: 1}
+_TYPE_NAMES = (SENT, RECEIVED)
+
+_HEADER = struct.Struct("<4sBI")
+_MAGIC = b"CHv1"
+
+
+class Message:
+    """A chat message materialized on demand from ChatHistory's arrays
+
+    Supports read-only mapping access (message['text'], message.get('type'))
+    so code written against the old message dicts keeps working.
+    """
+
+    __slots__ = ('type', 'text', 'timestamp')
+
+    def __init__(self, message_type: str, text: str, timestamp: float):
+        self.type = message_type
+        self.text = text
+        self.timestamp = timestamp
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def to_dict(self) -> Dict:
+        return {'type': self.type, 'text': self.text, 'timestamp': self.timestamp}
+
+    def __repr__(self) -> str:
+        return f"Message(type={self.type!r}, text={self.text!r}, timestamp={self.timestamp!r})"
+
+
+class HistoryView:
+    """Zero-copy window over a contiguous range of a ChatHistory"""
+
+    __slots__ = ('_history', '_start', '_stop')
+
+    def __init__(self, history: "ChatHistory", start: int, stop: int):
+        self._history = history
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __iter__(self) -> Iterator[Message]:
+        return self._history._iter_range(self._start, self._stop)
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Message, "HistoryView"]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step != 1:
+                raise ValueError("HistoryView only supports contiguous slices")
+            return HistoryView(self._history, self._start + start, self._start + max(start, stop))
+
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("history index out of range")
+        return self._history._message(self._start + key)
+
+
+class ChatHistory:
+    """Append-only chat history stored in parallel compact arrays
+
+    Types live in a bytearray, timestamps in a double array and texts in a
+    plain list, so a message costs one list slot plus its text instead of
+    a dict. Sent/received counters are kept as messages arrive, `version`
+    changes on every mutation, `generation` changes only when the history
+    is cleared, and slices/tails are zero-copy views.
+
+    With a storage backend, every message is also persisted and only the
+    newest `max_resident` messages are kept in memory; older ones are paged
+    in from storage when read.
+    """
+
+    def __init__(self, storage=None, conversation_id: Optional[str] = None,
+                 max_resident: Optional[int] = None, page_size: int = 50):
+        self._storage = storage
+        self.conversation_id = conversation_id
+        self.max_resident = max_resident
+        self.page_size = page_size
+        self.generation = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._types = bytearray()
+        self._timestamps = array('d')
+        self._texts = []
+        self._base = 0  # position of the first resident message
+        self.sent_count = 0
+        self.received_count = 0
+        self.version = 0
+
+    @classmethod
+    def open(cls, storage, conversation_id: str, max_resident: int, page_size: int = 50) -> "ChatHistory":
+        """Attach to a stored conversation, loading only its newest messages"""
+        history = cls(storage, conversation_id, max_resident, page_size)
+        total, received = storage.stats(conversation_id)
+        history._base = max(0, total - max_resident)
+        for code, text, timestamp in storage.load(conversation_id, history._base, max_resident):
+            history._append_resident(code, text, timestamp)
+        history.received_count = received
+        history.sent_count = total - received
+        history.version = total
+        return history
+
+    def _append_resident(self, code: int, text: str, timestamp: float) -> None:
+        self._types.append(code)
+        self._timestamps.append(timestamp)
+        self._texts.append(text)
+
+    def append(self, message_type: str, text: str, timestamp: Optional[float] = None) -> None:
+        """Add a message; message_type is 'sent' or 'received'"""
+        code = _TYPE_CODES[message_type]
+        timestamp = time.time() if timestamp is None else timestamp
+        self._append_resident(code, text, timestamp)
+        if code:
+            self.received_count += 1
+        else:
+            self.sent_count += 1
+        self.version += 1
+
+        if self._storage is not None:
+            self._storage.append(self.conversation_id, [(code, text, timestamp)])
+            if self.max_resident and len(self._texts) >= 2 * self.max_resident:
+                # Evict in halves so the cost is amortized O(1) per append
+                evict = len(self._texts) - self.max_resident
+                del self._types[:evict]
+                del self._timestamps[:evict]
+                del self._texts[:evict]
+                self._base += evict
+
+    def clear(self) -> None:
+        """Remove every message (including stored ones)"""
+        if self._storage is not None:
+            self._storage.clear(self.conversation_id)
+        version = self.version
+        self._reset()
+        self.version = version + 1
+        self.generation += 1
+
+    def _message(self, index: int) -> Message:
+        if index < self._base:
+            code, text, timestamp = self._storage.load(self.conversation_id, index, 1)[0]
+            return Message(_TYPE_NAMES[code], text, timestamp)
+        local = index - self._base
+        return Message(_TYPE_NAMES[self._types[local]], self._texts[local], self._timestamps[local])
+
+    def _iter_range(self, start: int, stop: int) -> Iterator[Message]:
+        """Yield messages in [start, stop), paging evicted ones from storage"""
+        index = start
+        while index < min(stop, self._base):
+            limit = min(self.page_size, self._base - index, stop - index)
+            for code, text, timestamp in self._storage.load(self.conversation_id, index, limit):
+                yield Message(_TYPE_NAMES[code], text, timestamp)
+            index += limit
+
+        for local in range(index - self._base, stop - self._base):
+            yield Message(_TYPE_NAMES[self._types[local]], self._texts[local], self._timestamps[local])
+
+    @property
+    def resident_count(self) -> int:
+        """Number of messages currently held in memory"""
+        return len(self._texts)
+
+    def __len__(self) -> int:
+        return self._base + len(self._texts)
+
+    def __iter__(self) -> Iterator[Message]:
+        return self._iter_range(0, len(self))
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Message, HistoryView]:
+        return HistoryView(self, 0, len(self))[key]
+
+    def tail(self, count: int) -> HistoryView:
+        """Zero-copy view of the newest `count` messages"""
+        return HistoryView(self, max(0, len(self) - count), len(self))
+
+    def serialize(self) -> bytes:
+        """Pack the whole history into a compact, compressed byte string"""
+        messages = list(self._iter_range(0, self._base)) if self._base else []
+        types = bytes(_TYPE_CODES[message.type] for message in messages) + bytes(self._types)
+        timestamps = array('d', (message.timestamp for message in messages))
+        timestamps.extend(self._timestamps)
+        encoded = [message.text.encode('utf-8') for message in messages]
+        encoded.extend(text.encode('utf-8') for text in self._texts)
+
+        lengths = array('I', (len(text) for text in encoded))
+        body = b"".join([
+            types,
+            timestamps.tobytes(),
+            lengths.tobytes(),
+            b"".join(encoded)
+        ])
+        return _HEADER.pack(_MAGIC, lengths.itemsize, len(self)) + zlib.compress(body)
+
+    @classmethod
+    def deserialize(cls, data: bytes) -> "ChatHistory":
+        """Rebuild a history produced by serialize()"""
+        magic, length_size, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not a serialized chat history")
+        body = zlib.decompress(data[_HEADER.size:])
+
+        history = cls()
+        offset = 0
+        history._types = bytearray(body[offset:offset + count])
+        offset += count
+
+        history._timestamps.frombytes(body[offset:offset + count * history._timestamps.itemsize])
+        offset += count * history._timestamps.itemsize
+
+        lengths = array('I')
+        if lengths.itemsize != length_size:
+            raise ValueError("Serialized history uses an unsupported length width")
+        lengths.frombytes(body[offset:offset + count * length_size])
+        offset += count * length_size
+
+        for length in lengths:
+            history._texts.append(body[offset:offset + length].decode('utf-8'))
+            offset += length
+
+        history.received_count = sum(history._types)
+        history.sent_count = count - history.received_count
+        history.version = count
+        return history
@@ -0,0 +1,161 @@
+import atexit
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import httpx
+from groq import Groq
+from config.settings import AppConfig
+
+
+def hash_api_key(api_key: str) -> str:
+    """Hash an API key so raw keys are never used as registry keys"""
+    return hashlib.sha256(api_key.strip().encode("utf-8")).hexdigest()
+
+
+class _PooledClient:
+    """A Groq client and the HTTP connection pool it owns"""
+
+    __slots__ = ("http_client", "client", "last_used")
+
+    def __init__(self, http_client: httpx.Client, client: Groq):
+        self.http_client = http_client
+        self.client = client
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.http_client.close()
+        except Exception:
+            pass
+
+
+class ClientPool:
+    """Thread-safe registry of keep-alive Groq clients keyed by API key
+
+    Streamlit re-executes the script on every interaction, but imported
+    modules stay loaded, so clients held here survive reruns and are shared
+    by every session using the same key.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        pool_config = dict(AppConfig.POOL_CONFIG)
+        pool_config.update(config or {})
+        self.config = pool_config
+        self._clients: "OrderedDict[str, _PooledClient]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _build_http_client(self) -> httpx.Client:
+        """Create an HTTP client with the configured pool limits"""
+        limits = httpx.Limits(
+            max_connections=self.config['max_connections'],
+            max_keepalive_connections=self.config['max_keepalive_connections'],
+            keepalive_expiry=self.config['keepalive_expiry']
+        )
+        http2 = self.config['http2']
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                # HTTP/2 needs the optional h2 package; fall back to HTTP/1.1
+                http2 = False
+
+        return httpx.Client(
+            verify=self.config['verify_tls'],
+            http2=http2,
+            limits=limits,
+            timeout=AppConfig.API_CONFIG['timeout']
+        )
+
+    def get(self, api_key: str) -> Groq:
+        """Get the pooled Groq client for an API key, creating it if needed"""
+        if self._closed:
+            raise RuntimeError("Client pool has been shut down")
+
+        key_id = hash_api_key(api_key)
+        with self._lock:
+            self._evict_idle_locked()
+
+            entry = self._clients.get(key_id)
+            if entry is None:
+                http_client = self._build_http_client()
+                # Retries and fallback are handled by utils.retry
+                client = Groq(api_key=api_key.strip(), http_client=http_client, max_retries=0)
+                entry = _PooledClient(http_client, client)
+                self._clients[key_id] = entry
+
+                while len(self._clients) > self.config['max_clients']:
+                    _, oldest = self._clients.popitem(last=False)
+                    oldest.close()
+            else:
+                self._clients.move_to_end(key_id)
+
+            entry.last_used = time.monotonic()
+            return entry.client
+
+    def _evict_idle_locked(self) -> int:
+        """Close clients unused for longer than the idle timeout (lock held)"""
+        cutoff = time.monotonic() - self.config['client_idle_timeout']
+        evicted = 0
+        # Entries are kept in least-recently-used order
+        while self._clients:
+            key_id, entry = next(iter(self._clients.items()))
+            if entry.last_used >= cutoff:
+                break
+            del self._clients[key_id]
+            entry.close()
+            evicted += 1
+        return evicted
+
+    def evict_idle(self) -> int:
+        """Close idle clients and return how many were evicted"""
+        with self._lock:
+            return self._evict_idle_locked()
+
+    def discard(self, api_key: str) -> None:
+        """Close and forget the client for a single API key"""
+        with self._lock:
+            entry = self._clients.pop(hash_api_key(api_key), None)
+        if entry is not None:
+            entry.close()
+
+    def shutdown(self) -> None:
+        """Close every pooled client; further get() calls will fail"""
+        with self._lock:
+            self._closed = True
+            entries = list(self._clients.values())
+            self._clients.clear()
+        for entry in entries:
+            entry.close()
+
+    def stats(self) -> Dict:
+        """Get pool statistics for diagnostics"""
+        with self._lock:
+            return {
+                'clients': len(self._clients),
+                'max_clients': self.config['max_clients'],
+                'closed': self._closed
+            }
+
+
+_pool: Optional[ClientPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_client_pool() -> ClientPool:
+    """Get the process-wide client pool"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ClientPool()
+                atexit.register(_pool.shutdown)
+    return _pool
+
+
+def get_groq_client(api_key: str) -> Groq:
+    """Get a pooled Groq client for an API key"""
+    return get_client_pool().get(api_key)
@@ -0,0 +1,87 @@
+from collections import deque
+from typing import Optional
+
+from config.settings import AppConfig
+from utils.chat_history import ChatHistory, Message
+from utils.model_catalog import get_model_catalog
+from utils.token_estimator import count_tokens
+
+
+def context_token_budget(model_key: str, max_tokens: int) -> int:
+    """Tokens of chat history that fit a model's window next to prompt and reply"""
+    context_config = AppConfig.CONTEXT_CONFIG
+    catalog = get_model_catalog()
+    window = catalog.context_window(catalog.resolve(model_key))
+    budget = min(
+        int(window * context_config['budget_ratio']),
+        window - max_tokens - context_config['reserve_tokens']
+    )
+    return max(budget, 64)
+
+
+class ContextBuilder:
+    """Incrementally maintained, token-counted window over the chat history
+
+    Only messages appended since the last call are rendered, and just the
+    newest `max_window_messages` lines are retained, so each call costs
+    O(1) amortized no matter how long the history grows. The rendered
+    prefix is cached until the history or the limits change.
+    """
+
+    def __init__(self, max_window_messages: Optional[int] = None):
+        self.max_window_messages = max_window_messages or AppConfig.CONTEXT_CONFIG['max_window_messages']
+        self.reset()
+
+    def reset(self) -> None:
+        self._lines = deque(maxlen=self.max_window_messages)
+        self._seen = 0
+        self._history_id = None
+        self._generation = None
+        self._cache_key = None
+        self._rendered = ""
+
+    @staticmethod
+    def _render_line(message: Message) -> str:
+        sender = "Friend" if message.type == 'received' else "You"
+        return f"{sender}: {message.text}\n"
+
+    def sync(self, history: ChatHistory) -> None:
+        """Render messages appended since the last sync"""
+        if id(history) != self._history_id or history.generation != self._generation:
+            # History was replaced or cleared
+            self.reset()
+            self._history_id = id(history)
+            self._generation = history.generation
+
+        start = max(self._seen, len(history) - self.max_window_messages)
+        for message in history[start:]:
+            line = self._render_line(message)
+            self._lines.append((line, count_tokens(line)))
+        self._seen = len(history)
+
+    def build(self, history: ChatHistory, max_messages: int, token_budget: int) -> str:
+        """Get the newest messages that fit both max_messages and token_budget"""
+        self.sync(history)
+
+        cache_key = (self._seen, max_messages, token_budget)
+        if cache_key == self._cache_key:
+            return self._rendered
+
+        selected = []
+        used = 0
+        for line, tokens in reversed(self._lines):
+            if len(selected) >= max_messages:
+                break
+            if used + tokens > token_budget:
+                if not selected:
+                    # Keep the tail of an oversized newest message rather than nothing
+                    prefix = line.split(': ', 1)[0] + ': …'
+                    tail_chars = max(1, token_budget * 4 - len(prefix))
+                    selected.append(prefix + line[-tail_chars:])
+                break
+            selected.append(line)
+            used += tokens
+
+        self._rendered = "".join(reversed(selected))
+        self._cache_key = cache_key
+        return self._rendered
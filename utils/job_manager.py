@@ -0,0 +1,110 @@
+import atexit
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from config.settings import AppConfig
+
+
+class JobLimitExceeded(Exception):
+    """Raised when a session already has its maximum number of jobs running"""
+
+    def __init__(self, limit: int):
+        super().__init__(f"At most {limit} AI requests can run at once")
+        self.limit = limit
+
+
+class Job:
+    """Handle to a background AI call, kept in session state between reruns
+
+    `key` records the input the job was started for (usually the draft) so
+    reruns can tell whether its result still applies. Workers may publish
+    partial output through `progress` and should stop once `cancelled`.
+    """
+
+    def __init__(self, name: str, key: str):
+        self.name = name
+        self.key = key
+        self.progress = ""
+        self.cancelled = False
+        self.started_at = time.monotonic()
+        self.future: Optional[Future] = None
+
+    def done(self) -> bool:
+        return self.future is not None and self.future.done()
+
+    def cancel(self) -> None:
+        """Cancel if still queued; a running job is asked to stop early"""
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+    def result(self):
+        """Result of a finished job (re-raises the worker's exception)"""
+        return self.future.result()
+
+
+class JobManager:
+    """Shared thread pool running AI calls off the Streamlit script thread
+
+    The pool is process-wide; each session may only have
+    `max_jobs_per_session` jobs queued or running at once.
+    """
+
+    def __init__(self, max_workers: int, max_jobs_per_session: int):
+        self.max_jobs_per_session = max_jobs_per_session
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-job")
+        self._active: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, session_id: str, name: str, key: str, fn: Callable, *args, **kwargs) -> Job:
+        """Run fn(job, *args, **kwargs) in the pool"""
+        with self._lock:
+            if self._active.get(session_id, 0) >= self.max_jobs_per_session:
+                raise JobLimitExceeded(self.max_jobs_per_session)
+            self._active[session_id] = self._active.get(session_id, 0) + 1
+
+        job = Job(name, key)
+        try:
+            job.future = self._executor.submit(fn, job, *args, **kwargs)
+        except Exception:
+            self._release(session_id)
+            raise
+        job.future.add_done_callback(lambda _: self._release(session_id))
+        return job
+
+    def _release(self, session_id: str) -> None:
+        with self._lock:
+            remaining = self._active.get(session_id, 0) - 1
+            if remaining > 0:
+                self._active[session_id] = remaining
+            else:
+                self._active.pop(session_id, None)
+
+    def active_jobs(self, session_id: str) -> int:
+        with self._lock:
+            return self._active.get(session_id, 0)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'sessions': len(self._active), 'active_jobs': sum(self._active.values())}
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Get the process-wide job manager"""
+    global _job_manager
+    if _job_manager is None:
+        with _job_manager_lock:
+            if _job_manager is None:
+                job_config = AppConfig.JOB_CONFIG
+                _job_manager = JobManager(job_config['max_workers'], job_config['max_jobs_per_session'])
+                atexit.register(_job_manager.shutdown)
+    return _job_manager
@@ -0,0 +1,96 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import groq
+from config.settings import AppConfig
+from utils.client_pool import get_client_pool, hash_api_key
+from utils.model_catalog import get_model_catalog
+
+
+class KeyValidator:
+    """Validates API keys with the models list endpoint and caches the verdict
+
+    Listing models costs no inference quota and is much faster than a chat
+    completion; the list is also handed to the model catalog. Verdicts are
+    cached per key hash: valid keys for `valid_ttl` seconds, rejected keys
+    for the shorter `invalid_ttl`. Network and server errors are never
+    cached.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        validation_config = dict(AppConfig.KEY_VALIDATION_CONFIG)
+        validation_config.update(config or {})
+        self.config = validation_config
+        self._verdicts: "OrderedDict[str, Tuple[bool, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, key_id: str) -> Optional[bool]:
+        with self._lock:
+            entry = self._verdicts.get(key_id)
+            if entry is None:
+                return None
+            valid, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._verdicts[key_id]
+                return None
+            return valid
+
+    def _remember(self, key_id: str, valid: bool) -> None:
+        ttl = self.config['valid_ttl'] if valid else self.config['invalid_ttl']
+        with self._lock:
+            self._verdicts[key_id] = (valid, time.monotonic() + ttl)
+            self._verdicts.move_to_end(key_id)
+            while len(self._verdicts) > self.config['max_entries']:
+                self._verdicts.popitem(last=False)
+
+    def validate(self, api_key: str) -> bool:
+        """Check whether an API key is accepted by the API"""
+        if not api_key or not api_key.strip():
+            return False
+
+        key_id = hash_api_key(api_key)
+        cached = self._cached(key_id)
+        if cached is not None:
+            return cached
+
+        pool = get_client_pool()
+        try:
+            response = pool.get(api_key).models.list(timeout=self.config['timeout'])
+        except (groq.AuthenticationError, groq.PermissionDeniedError):
+            self._remember(key_id, False)
+            # Don't keep a connection pool open for a rejected key
+            pool.discard(api_key)
+            return False
+        except Exception:
+            return False
+
+        self._remember(key_id, True)
+        # The same list seeds the model catalog
+        get_model_catalog().update(response.data)
+        return True
+
+    def invalidate(self, api_key: str) -> None:
+        """Forget the cached verdict for a key"""
+        with self._lock:
+            self._verdicts.pop(hash_api_key(api_key), None)
+
+
+_validator: Optional[KeyValidator] = None
+_validator_lock = threading.Lock()
+
+
+def get_key_validator() -> KeyValidator:
+    """Get the process-wide key validator"""
+    global _validator
+    if _validator is None:
+        with _validator_lock:
+            if _validator is None:
+                _validator = KeyValidator()
+    return _validator
+
+
+def validate_api_key(api_key: str) -> bool:
+    """Validate an API key through the shared, cached validator"""
+    return get_key_validator().validate(api_key)
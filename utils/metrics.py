@@ -0,0 +1,249 @@
+import atexit
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import AppConfig
+
+# name -> (type, help)
+METRICS = {
+    'ai_requests_total': ('counter', "Chat completion attempts by model, task and status (ok or error class)"),
+    'ai_request_duration_seconds': ('histogram', "Chat completion latency in seconds (streams: until the last chunk)"),
+    'ai_time_to_first_token_seconds': ('histogram', "Seconds until the first streamed token"),
+    'ai_prompt_tokens_total': ('counter', "Prompt tokens reported in response.usage"),
+    'ai_completion_tokens_total': ('counter', "Completion tokens reported in response.usage"),
+    'ai_retries_total': ('counter', "Attempts retried or moved to a fallback model"),
+    'ai_cache_requests_total': ('counter', "Response cache lookups by task and result (hit or miss)")
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(**labels) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Histogram:
+    """Cumulative-bucket histogram for one label set"""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return None
+        rank = fraction * self.count
+        seen = 0
+        lower = 0.0
+        for index, upper in enumerate(self.buckets):
+            if seen + self.counts[index] >= rank and self.counts[index]:
+                return lower + (upper - lower) * (rank - seen) / self.counts[index]
+            seen += self.counts[index]
+            lower = upper
+        # Beyond the last bucket: the largest finite bound is the best we know
+        return self.buckets[-1]
+
+
+class MetricsRegistry:
+    """In-process counters and histograms for every chat completion
+
+    Recording is a no-op unless FEATURES['analytics'] is on. Values are
+    process-wide (shared by all sessions) and exported in the Prometheus
+    text format.
+    """
+
+    def __init__(self, config: Optional[Dict] = None, enabled: Optional[bool] = None):
+        metrics_config = dict(AppConfig.METRICS_CONFIG)
+        metrics_config.update(config or {})
+        self.config = metrics_config
+        self.enabled = AppConfig.is_feature_enabled('analytics') if enabled is None else enabled
+        self.started_at = time.time()
+        self.server_error = None
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, name: str, labels: Labels, value: float = 1) -> None:
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[labels] = series.get(labels, 0) + value
+
+    def observe(self, name: str, labels: Labels, value: float) -> None:
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(labels)
+            if histogram is None:
+                histogram = series[labels] = _Histogram(tuple(self.config['buckets']))
+            histogram.observe(value)
+
+    def record_request(self, model: str, task: str, latency: float, usage=None,
+                       ttft: Optional[float] = None, error: Optional[Exception] = None) -> None:
+        """Record one completion attempt (successful or failed)"""
+        if not self.enabled:
+            return
+        status = "ok" if error is None else type(error).__name__
+        self.inc('ai_requests_total', _labels(model=model, task=task, status=status))
+        self.observe('ai_request_duration_seconds', _labels(model=model, task=task, outcome="ok" if error is None else "error"), latency)
+        if ttft is not None:
+            self.observe('ai_time_to_first_token_seconds', _labels(model=model, task=task), ttft)
+        if usage is not None:
+            labels = _labels(model=model, task=task)
+            self.inc('ai_prompt_tokens_total', labels, getattr(usage, 'prompt_tokens', 0) or 0)
+            self.inc('ai_completion_tokens_total', labels, getattr(usage, 'completion_tokens', 0) or 0)
+
+    def record_retry(self, model: str, task: str) -> None:
+        if self.enabled:
+            self.inc('ai_retries_total', _labels(model=model, task=task))
+
+    def record_cache(self, task: str, hit: bool) -> None:
+        if self.enabled:
+            self.inc('ai_cache_requests_total', _labels(task=task, result="hit" if hit else "miss"))
+
+    def render_prometheus(self) -> str:
+        """Export all series in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name, (kind, help_text) in METRICS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                if kind == 'counter':
+                    for labels, value in sorted(self._counters.get(name, {}).items()):
+                        lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+                    continue
+
+                for labels, histogram in sorted(self._histograms.get(name, {}).items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', repr(float(bound))))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> List[Dict]:
+        """One row per (model, task) for the admin panel, busiest first"""
+        rows: Dict[Tuple[str, str], Dict] = {}
+
+        def row(labels: Labels) -> Dict:
+            values = dict(labels)
+            key = (values['model'], values['task'])
+            if key not in rows:
+                rows[key] = {
+                    'model': key[0], 'task': key[1], 'requests': 0, 'errors': 0, 'retries': 0,
+                    'p50_s': None, 'p95_s': None, 'ttft_p50_s': None,
+                    'prompt_tokens': 0, 'completion_tokens': 0
+                }
+            return rows[key]
+
+        with self._lock:
+            for labels, value in self._counters.get('ai_requests_total', {}).items():
+                entry = row(labels)
+                entry['requests'] += int(value)
+                if dict(labels)['status'] != "ok":
+                    entry['errors'] += int(value)
+            for name, field in (('ai_retries_total', 'retries'),
+                                ('ai_prompt_tokens_total', 'prompt_tokens'),
+                                ('ai_completion_tokens_total', 'completion_tokens')):
+                for labels, value in self._counters.get(name, {}).items():
+                    row(labels)[field] += int(value)
+            for labels, histogram in self._histograms.get('ai_request_duration_seconds', {}).items():
+                if dict(labels)['outcome'] == "ok":
+                    entry = row(labels)
+                    entry['p50_s'] = histogram.quantile(0.5)
+                    entry['p95_s'] = histogram.quantile(0.95)
+            for labels, histogram in self._histograms.get('ai_time_to_first_token_seconds', {}).items():
+                row(labels)['ttft_p50_s'] = histogram.quantile(0.5)
+
+        return sorted(rows.values(), key=lambda entry: entry['requests'], reverse=True)
+
+    def cache_hit_rate(self) -> Optional[float]:
+        with self._lock:
+            hits = misses = 0
+            for labels, value in self._counters.get('ai_cache_requests_total', {}).items():
+                if dict(labels)['result'] == "hit":
+                    hits += value
+                else:
+                    misses += value
+        return hits / (hits + misses) if hits + misses else None
+
+    def endpoint_url(self) -> str:
+        return f"http://{self.config['host']}:{self.config['port']}/metrics"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    """Serves GET /metrics from the registry attached to the server"""
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = self.server.registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Keep the Streamlit terminal quiet
+        pass
+
+
+def start_metrics_server(registry: MetricsRegistry) -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics on a daemon thread; returns None if the port can't be bound"""
+    try:
+        server = ThreadingHTTPServer((registry.config['host'], registry.config['port']), _MetricsHandler)
+    except OSError as e:
+        # Usually another app process already serves the endpoint
+        registry.server_error = str(e)
+        return None
+    server.daemon_threads = True
+    server.registry = registry
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+_metrics: Optional[MetricsRegistry] = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Get the process-wide metrics registry, starting the /metrics endpoint once"""
+    global _metrics
+    if _metrics is None:
+        with _metrics_lock:
+            if _metrics is None:
+                registry = MetricsRegistry()
+                if registry.enabled and registry.config['serve']:
+                    server = start_metrics_server(registry)
+                    if server is not None:
+                        atexit.register(server.shutdown)
+                _metrics = registry
+    return _metrics
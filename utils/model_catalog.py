@@ -0,0 +1,239 @@
+import json
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional
+
+from config.settings import AppConfig
+from utils.client_pool import get_client_pool
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def _model_dict(model) -> Dict:
+    """Normalize an SDK model object or a plain dict from models.json"""
+    if isinstance(model, dict):
+        return model
+    if hasattr(model, 'to_dict'):
+        return model.to_dict()
+    return {key: getattr(model, key, None) for key in ('id', 'owned_by', 'active', 'context_window')}
+
+
+class LatencyStats:
+    """Sliding window of observed latencies, overheads, output speeds and errors for one model"""
+
+    def __init__(self, window: int):
+        self.latencies = deque(maxlen=window)
+        self.overheads = deque(maxlen=window)
+        self.tokens_per_sec = deque(maxlen=window)
+        self.outcomes = deque(maxlen=window)  # 1 = failed request, 0 = succeeded
+
+    def record(self, latency: float, tokens_per_sec: Optional[float] = None,
+               overhead: Optional[float] = None) -> None:
+        self.latencies.append(latency)
+        self.outcomes.append(0)
+        if tokens_per_sec:
+            self.tokens_per_sec.append(tokens_per_sec)
+        if overhead is not None:
+            self.overheads.append(overhead)
+
+    def record_error(self) -> None:
+        self.outcomes.append(1)
+
+    def snapshot(self) -> Dict:
+        latencies = sorted(self.latencies)
+        speeds = sorted(self.tokens_per_sec)
+        return {
+            'samples': len(latencies),
+            'p50': _percentile(latencies, 0.5),
+            'p95': _percentile(latencies, 0.95),
+            'overhead': _percentile(sorted(self.overheads), 0.5),
+            'tokens_per_sec': _percentile(speeds, 0.5),
+            'error_rate': sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+        }
+
+
+class ModelCatalog:
+    """Process-wide view of available models plus their observed latency
+
+    Starts from the bundled config/models.json so it works offline, then
+    is replaced by the live models list (fetched in the background with an
+    API key, or handed over by the key validator) and refreshed after
+    `ttl` seconds.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        catalog_config = dict(AppConfig.MODEL_CATALOG_CONFIG)
+        catalog_config.update(config or {})
+        self.config = catalog_config
+        self.source = None
+        self.last_error = None
+        self._models: Dict[str, Dict] = {}
+        self._stats: Dict[str, LatencyStats] = {}
+        self._next_refresh = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._load_local()
+
+    def _load_local(self) -> None:
+        try:
+            with open(self.config['fallback_path'], encoding='utf-8') as handle:
+                models = json.load(handle)['data']
+        except (OSError, ValueError, KeyError) as e:
+            self.last_error = str(e)
+            return
+        self._replace(models, 'local')
+
+    def _replace(self, models: Iterable, source: str) -> None:
+        entries = {}
+        for model in models:
+            entry = _model_dict(model)
+            if entry.get('id'):
+                entries[entry['id']] = entry
+        with self._lock:
+            self._models = entries
+            self.source = source
+
+    def update(self, models: Iterable) -> None:
+        """Replace the catalog with a live models list"""
+        self._replace(models, 'api')
+        with self._lock:
+            self._next_refresh = time.monotonic() + self.config['ttl']
+            self.last_error = None
+
+    def is_stale(self) -> bool:
+        with self._lock:
+            return time.monotonic() >= self._next_refresh
+
+    def refresh(self, api_key: str) -> bool:
+        """Fetch the models list now; keeps the current catalog on failure"""
+        try:
+            response = get_client_pool().get(api_key).models.list(timeout=self.config['timeout'])
+        except Exception as e:
+            with self._lock:
+                self.last_error = str(e)
+                self._next_refresh = time.monotonic() + self.config['retry_interval']
+            return False
+        self.update(response.data)
+        return True
+
+    def ensure_fresh(self, api_key: str) -> None:
+        """Refresh in the background if the catalog is older than its TTL"""
+        if not api_key:
+            return
+        with self._lock:
+            if self._refreshing or time.monotonic() < self._next_refresh:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh(api_key)
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def is_available(self, model_id: str) -> bool:
+        """Whether a model can be used; unknown models only count as missing in a live list"""
+        with self._lock:
+            entry = self._models.get(model_id)
+            if entry is None:
+                return self.source != 'api'
+        return entry.get('active', True) is not False
+
+    def resolve(self, model_key: str) -> str:
+        """Map a UI model key to a model id, skipping models that are gone"""
+        preferred = AppConfig.get_model_name(model_key)
+        if self.is_available(preferred):
+            return preferred
+        for fallback in AppConfig.MODEL_FALLBACKS.get(preferred, []):
+            if self.is_available(fallback):
+                return fallback
+        # Nothing better known; the retry policy handles the failure
+        return preferred
+
+    def context_window(self, model_id: str) -> int:
+        """Context window in tokens as listed by the API, or the configured default"""
+        with self._lock:
+            window = self._models.get(model_id, {}).get('context_window')
+        return window or AppConfig.CONTEXT_CONFIG['default_window']
+
+    def record_latency(self, model_id: str, latency: float, completion_tokens: Optional[int] = None,
+                       generation_time: Optional[float] = None) -> None:
+        """Record one request
+
+        With generation_time (decode time, excluding queueing and time to
+        first token) tokens/sec covers decoding only and the rest of the
+        latency is recorded as per-request overhead.
+        """
+        tokens_per_sec = None
+        overhead = None
+        duration = latency
+        if generation_time and 0 < generation_time <= latency:
+            duration = generation_time
+            overhead = latency - generation_time
+        if completion_tokens and duration > 0:
+            tokens_per_sec = completion_tokens / duration
+        with self._lock:
+            self._model_stats(model_id).record(latency, tokens_per_sec, overhead)
+
+    def record_error(self, model_id: str) -> None:
+        """Record a failed request (feeds the error rate used for routing)"""
+        with self._lock:
+            self._model_stats(model_id).record_error()
+
+    def _model_stats(self, model_id: str) -> LatencyStats:
+        stats = self._stats.get(model_id)
+        if stats is None:
+            stats = self._stats[model_id] = LatencyStats(self.config['latency_window'])
+        return stats
+
+    def latency_stats(self, model_id: str) -> Dict:
+        with self._lock:
+            stats = self._stats.get(model_id)
+            if stats is None:
+                return {'samples': 0, 'p50': None, 'p95': None, 'overhead': None,
+                        'tokens_per_sec': None, 'error_rate': 0.0}
+            return stats.snapshot()
+
+    def model_info(self, model_key: str) -> Dict:
+        """Static details for a UI model key merged with live availability and latency"""
+        model_id = self.resolve(model_key)
+        info = dict(AppConfig.MODEL_INFO.get(model_key, {}))
+        info.update({
+            'name': model_id,
+            'available': self.is_available(model_id),
+            'context_window': self.context_window(model_id)
+        })
+        info.update(self.latency_stats(model_id))
+        return info
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'source': self.source,
+                'models': len(self._models),
+                'tracked_models': len(self._stats),
+                'last_error': self.last_error
+            }
+
+
+_catalog: Optional[ModelCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def get_model_catalog() -> ModelCatalog:
+    """Get the process-wide model catalog"""
+    global _catalog
+    if _catalog is None:
+        with _catalog_lock:
+            if _catalog is None:
+                _catalog = ModelCatalog()
+    return _catalog
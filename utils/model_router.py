@@ -0,0 +1,109 @@
+from typing import Dict, List, Optional
+
+from config.settings import AppConfig
+from utils.model_catalog import ModelCatalog, get_model_catalog
+from utils.retry import CircuitBreaker, get_circuit_breaker
+from utils.token_estimator import count_message_tokens, count_tokens
+
+
+class ModelRouter:
+    """Picks a model per request for the adaptive "🎯 Balanced" setting
+
+    Candidates are tried cheapest first; the first healthy one whose
+    predicted latency meets the task's SLO wins. Long drafts on tasks that
+    benefit from a bigger model are escalated straight to it. Predictions
+    scale with the request: per-request overhead plus prefill and decode
+    time for its prompt and max_tokens. Overhead and decode speed are the
+    catalog's observed medians once a model has enough samples; configured
+    priors fill in before that and always supply the prefill speed.
+    """
+
+    def __init__(self, catalog: Optional[ModelCatalog] = None, config: Optional[Dict] = None):
+        router_config = dict(AppConfig.ROUTER_CONFIG)
+        router_config.update(config or {})
+        self.config = router_config
+        self.catalog = catalog or get_model_catalog()
+
+    def handles(self, model_key: str) -> bool:
+        """Whether requests for this UI model key are routed"""
+        return self.config['enabled'] and model_key == self.config['model_key']
+
+    def latency_slo(self, task: str) -> float:
+        return self.config['task_slo'].get(task, self.config['latency_slo'])
+
+    def is_complex(self, task: str, draft: str) -> bool:
+        """Long drafts on open-ended tasks are worth the bigger model"""
+        return task in self.config['escalate_tasks'] and count_tokens(draft or "") >= self.config['complex_draft_tokens']
+
+    def is_healthy(self, model_id: str) -> bool:
+        if not self.catalog.is_available(model_id):
+            return False
+        breaker = get_circuit_breaker(model_id)
+        if breaker.state != CircuitBreaker.CLOSED:
+            # Skipped until the cool-down ends, then routed to as the trial request
+            return breaker.available()
+        return self.catalog.latency_stats(model_id)['error_rate'] <= self.config['max_error_rate']
+
+    def predict_latency(self, model_key: str, model_id: str, prompt_tokens: int, max_tokens: int) -> float:
+        """Expected seconds for a request of this size"""
+        prior = self.config['priors'][model_key]
+        overhead = prior['overhead']
+        decode_speed = prior['tokens_per_sec']
+
+        stats = self.catalog.latency_stats(model_id)
+        if stats['samples'] >= self.config['min_samples']:
+            overhead = stats['overhead'] if stats['overhead'] is not None else overhead
+            decode_speed = stats['tokens_per_sec'] or decode_speed
+        return overhead + prompt_tokens / prior['prefill_tokens_per_sec'] + max_tokens / decode_speed
+
+    def predict_model_latency(self, model_id: str, prompt_tokens: int, max_tokens: int) -> Optional[float]:
+        """Expected seconds for a request to a model id, using the priors of the key that maps to it"""
+        for model_key in self.config['priors']:
+            preferred = AppConfig.get_model_name(model_key)
+            if model_id in (preferred, self.catalog.resolve(model_key)) or model_id in AppConfig.MODEL_FALLBACKS.get(preferred, []):
+                return self.predict_latency(model_key, model_id, prompt_tokens, max_tokens)
+        return None
+
+    def select(self, settings: Dict, task: str, messages: List[Dict], draft: str = "",
+               max_tokens: Optional[int] = None) -> str:
+        """Model id for a request; the adaptive setting is routed per request"""
+        model_key = settings.get('model', '🎯 Balanced')
+        if self.handles(model_key):
+            return self.route(task, messages, max_tokens or settings.get('max_tokens', 400), draft)
+        return self.catalog.resolve(model_key)
+
+    def route(self, task: str, messages: List[Dict], max_tokens: int, draft: str = "") -> str:
+        """Get the model id to use for one request"""
+        if self.is_complex(task, draft):
+            escalated = self.catalog.resolve(self.config['escalation_model_key'])
+            if self.is_healthy(escalated):
+                return escalated
+
+        prompt_tokens = count_message_tokens(messages)
+        slo = self.latency_slo(task)
+        fastest = None
+        fastest_latency = None
+
+        for model_key in self.config['candidates']:
+            model_id = self.catalog.resolve(model_key)
+            if not self.is_healthy(model_id):
+                continue
+            predicted = self.predict_latency(model_key, model_id, prompt_tokens, max_tokens)
+            if predicted <= slo:
+                return model_id
+            if fastest_latency is None or predicted < fastest_latency:
+                fastest, fastest_latency = model_id, predicted
+
+        # Nothing meets the SLO: take the quickest healthy model, else the cheapest
+        return fastest or self.catalog.resolve(self.config['candidates'][0])
+
+
+_router: Optional[ModelRouter] = None
+
+
+def get_model_router() -> ModelRouter:
+    """Get the process-wide model router"""
+    global _router
+    if _router is None:
+        _router = ModelRouter()
+    return _router
@@ -0,0 +1,150 @@
+import atexit
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional, Tuple
+
+from config.settings import AppConfig
+from utils.client_pool import hash_api_key
+from utils.job_manager import Job
+
+
+def _digest(value) -> str:
+    payload = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def prefetch_key(api_key: str, draft: str, context: str, settings: Dict) -> str:
+    """Identify a suggestions request by (API key, draft hash, context hash, settings hash)"""
+    return ":".join([
+        hash_api_key(api_key)[:16],
+        _digest(draft.strip()),
+        _digest(context),
+        _digest(settings)
+    ])
+
+
+class SuggestionPrefetcher:
+    """Speculatively starts suggestions before the user asks for them
+
+    Process-wide. A session schedules a run when its draft has been idle
+    for a while, or right away when a message is received; scheduling again
+    before the delay passes replaces the pending run. Started runs are kept
+    as Jobs under their prefetch_key for `ttl` seconds and handed over,
+    finished or still running, to the first Get Help that asks for the same
+    key. Each API key may start at most `budget_per_minute` prefetches.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        prefetch_config = dict(AppConfig.PREFETCH_CONFIG)
+        prefetch_config.update(config or {})
+        self.config = prefetch_config
+        self._executor = ThreadPoolExecutor(max_workers=prefetch_config['max_workers'], thread_name_prefix="prefetch")
+        self._jobs: "OrderedDict[str, Tuple[Job, float]]" = OrderedDict()
+        self._scheduled: Dict[str, Tuple[int, str]] = {}  # session id -> (generation, key)
+        self._spent: Dict[str, deque] = {}  # API key hash -> start times in the last minute
+        self._counts = {'started': 0, 'hits': 0, 'misses': 0, 'over_budget': 0}
+        self._lock = threading.Lock()
+
+    def schedule(self, session_id: str, key: str, draft: str, api_key: str, delay: float,
+                 fn: Callable, *args) -> bool:
+        """Run fn(job, *args) for `key` after `delay` seconds unless the session schedules something else"""
+        with self._lock:
+            self._expire_locked()
+            if key in self._jobs:
+                return False
+            generation, scheduled_key = self._scheduled.get(session_id, (0, None))
+            if scheduled_key == key:
+                # Already waiting for this exact request; don't restart the idle timer
+                return False
+            generation += 1
+            self._scheduled[session_id] = (generation, key)
+
+        timer = threading.Timer(delay, self._fire, args=(session_id, generation, key, draft, api_key, fn, args))
+        timer.daemon = True
+        timer.start()
+        return True
+
+    def cancel(self, session_id: str) -> None:
+        """Drop a session's pending (not yet started) prefetch"""
+        with self._lock:
+            if session_id in self._scheduled:
+                generation, _ = self._scheduled[session_id]
+                self._scheduled[session_id] = (generation + 1, None)
+
+    def _fire(self, session_id: str, generation: int, key: str, draft: str, api_key: str,
+              fn: Callable, args: tuple) -> None:
+        with self._lock:
+            if self._scheduled.get(session_id, (0, None))[0] != generation:
+                return
+            del self._scheduled[session_id]
+            if key in self._jobs:
+                return
+            if not self._take_budget_locked(hash_api_key(api_key)):
+                self._counts['over_budget'] += 1
+                return
+
+            job = Job('prefetch', draft.strip())
+            try:
+                job.future = self._executor.submit(fn, job, *args)
+            except RuntimeError:
+                # Executor already shut down at exit
+                return
+            self._jobs[key] = (job, time.monotonic() + self.config['ttl'])
+            while len(self._jobs) > self.config['max_entries']:
+                _, (evicted, _) = self._jobs.popitem(last=False)
+                evicted.cancel()
+            self._counts['started'] += 1
+
+    def _take_budget_locked(self, key_id: str) -> bool:
+        now = time.monotonic()
+        spent = self._spent.setdefault(key_id, deque())
+        while spent and spent[0] <= now - 60:
+            spent.popleft()
+        if len(spent) >= self.config['budget_per_minute']:
+            return False
+        spent.append(now)
+        return True
+
+    def _expire_locked(self) -> None:
+        now = time.monotonic()
+        for key in [key for key, (_, expires_at) in self._jobs.items() if expires_at <= now]:
+            self._jobs.pop(key)[0].cancel()
+
+    def claim(self, key: str) -> Optional[Job]:
+        """Take the prefetched job for `key` (finished or still running), if there is a usable one"""
+        with self._lock:
+            self._expire_locked()
+            job, _ = self._jobs.pop(key, (None, None))
+            usable = job is not None and not job.future.cancelled()
+            if usable and job.done():
+                usable = job.future.exception() is None
+            self._counts['hits' if usable else 'misses'] += 1
+        return job if usable else None
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._counts)
+            stats['held'] = len(self._jobs)
+            return stats
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
+
+
+_prefetcher: Optional[SuggestionPrefetcher] = None
+_prefetcher_lock = threading.Lock()
+
+
+def get_prefetcher() -> SuggestionPrefetcher:
+    """Get the process-wide suggestions prefetcher"""
+    global _prefetcher
+    if _prefetcher is None:
+        with _prefetcher_lock:
+            if _prefetcher is None:
+                _prefetcher = SuggestionPrefetcher()
+                atexit.register(_prefetcher.shutdown)
+    return _prefetcher
@@ -0,0 +1,153 @@
+import re
+from functools import lru_cache
+from string import Template
+from typing import Dict, List, Optional
+
+from config.settings import AppConfig
+from utils.token_estimator import count_tokens
+
+_BLANK_RUNS = re.compile(r"\n{3,}")
+
+
+def normalize_whitespace(text: str) -> str:
+    """Drop indentation and trailing spaces, keeping at most one blank line in a row"""
+    lines = [line.strip() for line in text.strip().splitlines()]
+    return _BLANK_RUNS.sub("\n\n", "\n".join(lines))
+
+
+# Settings go last so every request for a task shares the same leading
+# text; provider-side prompt caching matches on the longest common prefix.
+_SETTINGS_TAIL = """
+    Style: $style
+    Length: $length"""
+
+# System prompts: rendered once per (task, style, length) and memoized
+SYSTEM_TEMPLATES = {
+    'chat': """You are a helpful chat assistant. Respond in the style and at the length below.""" + _SETTINGS_TAIL,
+
+    'suggestions': """You are a helpful chat assistant. Provide natural, engaging suggestions that fit the conversation context.
+    For the user's draft, provide:
+    1. An improved version of their draft (if grammar/style needs fixing)
+    2. 2 alternative reply suggestions
+
+    Always format your response as:
+    **✨ Improved:** [enhanced version]
+    **💡 Option 1:** [alternative 1]
+    **💡 Option 2:** [alternative 2]
+    """ + _SETTINGS_TAIL,
+
+    'structured_suggestions': """You are a helpful chat assistant. Provide natural, engaging suggestions that fit the conversation context.
+    For the user's draft, provide an improved version (if grammar/style needs fixing) and 2 alternative replies.
+
+    Respond with a JSON object only, in this shape:
+    {"improved": "<enhanced version of the draft>", "options": ["<alternative 1>", "<alternative 2>"]}
+    """ + _SETTINGS_TAIL,
+
+    'assist': """You are a helpful chat assistant. In one pass, fix the grammar and spelling of the user's draft, suggest alternative replies, and read the mood of the conversation.
+
+    Respond with a JSON object only, in this shape:
+    {"corrected": "<draft with grammar fixed, same meaning>", "options": ["<alternative 1>", "<alternative 2>"], "mood": "<positive|negative|neutral|excited|confused|romantic|professional>", "confidence": <0.0-1.0>}
+    """ + _SETTINGS_TAIL,
+
+    'grammar': """Fix grammar and spelling. Keep the same meaning. Return only the corrected text.
+    Style: $style""",
+
+    'grammar_batch': """Fix grammar and spelling errors in every item. Keep the same meaning of each one.
+    Respond with a JSON object only, in this shape:
+    {"items": [{"id": <same id as the input>, "text": "<corrected text>"}]}
+    Style: $style""",
+
+    'mood': """Analyze the mood and tone of this conversation.
+    Return a JSON object with:
+    - mood: (positive/negative/neutral/excited/confused/romantic/professional)
+    - confidence: (0.0-1.0)
+    - suggestions: [list of 2-3 response suggestions that match the mood]
+
+    Keep suggestions brief and contextually appropriate.""",
+
+    'summary': """Update the running summary of a chat between the user (You) and a Friend.
+    Keep names, plans, open questions and the overall tone.
+    Return only the updated summary, under 120 words."""
+}
+
+# Per-request messages: filled on every call, with the stable part (context) first
+USER_TEMPLATES = {
+    'chat_user': """Context: $context
+    User message: $message""",
+
+    'suggestions_user': """Conversation context:
+    $context
+
+    The user is drafting: "$draft\"""",
+
+    'assist_user': """Conversation context:
+    $context
+    Draft: "$draft"
+    Give $options options.""",
+
+    'grammar_fix': """Fix grammar and spelling errors in this text. Keep the same meaning and style. Only return the corrected text: $text""",
+
+    'mood_user': """Conversation:
+    $conversation""",
+
+    'summary_user': """Current summary: $summary
+
+    New messages:
+    $messages""",
+
+    'quick_responses': """Based on this conversation context, suggest 3 brief, natural responses (each under 10 words):
+
+    Context: $context
+
+    Format as simple lines without numbering or formatting."""
+}
+
+# Whitespace is normalized once, at import
+_COMPILED = {
+    name: Template(normalize_whitespace(source))
+    for name, source in {**SYSTEM_TEMPLATES, **USER_TEMPLATES}.items()
+}
+
+
+class _Blank(dict):
+    """Fills every missing placeholder with nothing (for measuring the fixed part of a template)"""
+
+    def __missing__(self, key: str) -> str:
+        return ""
+
+
+@lru_cache(maxsize=256)
+def get_system_prompt(task: str, style: str = "", length: str = "") -> str:
+    """Get the system prompt for a task and UI style/length keys"""
+    return _COMPILED[task].substitute(
+        style=AppConfig.get_style_prompt(style),
+        length=AppConfig.get_length_prompt(length)
+    )
+
+
+def render_prompt(name: str, **values) -> str:
+    """Fill a per-request template; values are inserted verbatim"""
+    return _COMPILED[name].substitute(**values)
+
+
+def template_token_counts(style: Optional[str] = None, length: Optional[str] = None) -> Dict[str, int]:
+    """Estimated tokens each template adds to a request, before any per-request values"""
+    style = style or AppConfig.DEFAULTS['chat_style']
+    length = length or AppConfig.DEFAULTS['reply_length']
+    counts = {task: count_tokens(get_system_prompt(task, style, length)) for task in SYSTEM_TEMPLATES}
+    counts.update({name: count_tokens(_COMPILED[name].substitute(_Blank())) for name in USER_TEMPLATES})
+    return counts
+
+
+def build_suggestion_messages(user_input: str, context: str, settings: Dict,
+                              structured: bool = False) -> List[Dict]:
+    """Message list for draft suggestions"""
+    # Instructions, style and length live in the system prompt; only the request varies here
+    return [
+        {"role": "system", "content": get_system_prompt(
+            "structured_suggestions" if structured else "suggestions",
+            settings.get('style', '💬 Casual'),
+            settings.get('length', '📄 Medium')
+        )},
+        {"role": "user", "content": render_prompt('suggestions_user', context=context, draft=user_input)}
+    ]
@@ -0,0 +1,215 @@
+import re
+import threading
+import time
+from typing import Dict, Mapping, Optional, Tuple
+
+from config.settings import AppConfig
+from utils.client_pool import hash_api_key
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the local budget cannot admit a request within max_wait"""
+
+    def __init__(self, wait: float):
+        self.wait = wait
+        super().__init__(f"Rate limit reached, retry in {wait:.1f}s")
+
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_SCALE = {'h': 3600.0, 'm': 60.0, 's': 1.0, 'ms': 0.001}
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse a Groq reset header such as '2m59.56s' or '120ms' into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_SCALE[unit] for amount, unit in parts)
+
+
+class TokenBucket:
+    """Token bucket that hands out reservations instead of sleeping
+
+    reserve() always debits the bucket, possibly into debt, and returns how
+    long the caller must wait before the reserved capacity is really there.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.period = period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
+            self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` could be reserved without going into debt"""
+        self._refill(now)
+        wait = max(0.0, self.blocked_until - now)
+        if self.tokens < amount:
+            wait = max(wait, (amount - self.tokens) / self.refill_rate)
+        return wait
+
+    def reserve(self, amount: float, now: float) -> float:
+        """Debit `amount` and return the wait before it may be spent"""
+        wait = self.wait_time(amount, now)
+        self.tokens -= amount
+        return wait
+
+    def refund(self, amount: float, now: float) -> None:
+        """Return unused capacity (or debit more when amount is negative)"""
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def sync(self, limit: Optional[float], remaining: Optional[float],
+             reset: Optional[float], now: float) -> None:
+        """Adopt the provider's view of this budget from response headers"""
+        self._refill(now)
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+            if remaining <= 0 and reset:
+                self.blocked_until = max(self.blocked_until, now + reset)
+
+
+class RateLimiter:
+    """Process-wide requests-per-minute and tokens-per-minute limiter
+
+    Budgets are keyed by (API key, model) and adapt to Groq's
+    x-ratelimit-* response headers, so every session sharing a key draws
+    from the same buckets.
+    """
+
+    def __init__(self, config: Optional[Dict] = None):
+        limit_config = dict(AppConfig.RATE_LIMIT_CONFIG)
+        limit_config.update(config or {})
+        self.config = limit_config
+        self._buckets: Dict[Tuple[str, str], Tuple[TokenBucket, TokenBucket]] = {}
+        self._lock = threading.Lock()
+
+    def _get_buckets(self, api_key: str, model: str) -> Tuple[TokenBucket, TokenBucket]:
+        key = (hash_api_key(api_key), model)
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            buckets = (
+                TokenBucket(self.config['requests_per_minute']),
+                TokenBucket(self.config['tokens_per_minute'])
+            )
+            self._buckets[key] = buckets
+        return buckets
+
+    def reserve(self, api_key: str, model: str, tokens: int) -> float:
+        """Reserve one request and `tokens` tokens; return the required wait
+
+        Raises RateLimitExceeded without debiting anything if the wait would
+        exceed the configured max_wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            requests, token_budget = self._get_buckets(api_key, model)
+
+            wait = max(requests.wait_time(1, now), token_budget.wait_time(tokens, now))
+            if wait > self.config['max_wait']:
+                raise RateLimitExceeded(wait)
+
+            requests.reserve(1, now)
+            token_budget.reserve(tokens, now)
+            return wait
+
+    def wait_time(self, api_key: str, model: str, tokens: int) -> float:
+        """Seconds until one request of `tokens` tokens could be reserved, without reserving it"""
+        with self._lock:
+            now = time.monotonic()
+            requests, token_budget = self._get_buckets(api_key, model)
+            return max(requests.wait_time(1, now), token_budget.wait_time(tokens, now))
+
+    def token_capacity(self, api_key: str, model: str) -> float:
+        """Tokens-per-minute capacity of the (API key, model) budget"""
+        with self._lock:
+            return self._get_buckets(api_key, model)[1].capacity
+
+    def settle(self, api_key: str, model: str, reserved_tokens: int, used_tokens: Optional[int]) -> None:
+        """Correct a token reservation once the real usage is known"""
+        if used_tokens is None:
+            return
+        with self._lock:
+            _, token_budget = self._get_buckets(api_key, model)
+            token_budget.refund(reserved_tokens - used_tokens, time.monotonic())
+
+    def update_from_headers(self, api_key: str, model: str, headers: Mapping[str, str]) -> None:
+        """Adapt budgets to Groq's x-ratelimit-* and retry-after headers"""
+        def _number(name: str) -> Optional[float]:
+            try:
+                return float(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        with self._lock:
+            now = time.monotonic()
+            requests, token_budget = self._get_buckets(api_key, model)
+
+            # Groq reports the request budget per day; only its exhaustion matters here
+            requests.sync(
+                None,
+                _number('x-ratelimit-remaining-requests'),
+                parse_reset_duration(headers.get('x-ratelimit-reset-requests')),
+                now
+            )
+            token_budget.sync(
+                _number('x-ratelimit-limit-tokens'),
+                _number('x-ratelimit-remaining-tokens'),
+                parse_reset_duration(headers.get('x-ratelimit-reset-tokens')),
+                now
+            )
+
+            retry_after = parse_reset_duration(headers.get('retry-after'))
+            if retry_after:
+                for bucket in (requests, token_budget):
+                    bucket.blocked_until = max(bucket.blocked_until, now + retry_after)
+
+    def stats(self, api_key: str, model: str) -> Dict:
+        """Get the current budget for a key and model"""
+        with self._lock:
+            now = time.monotonic()
+            requests, token_budget = self._get_buckets(api_key, model)
+            requests._refill(now)
+            token_budget._refill(now)
+            return {
+                'requests_available': requests.tokens,
+                'requests_per_minute': requests.capacity,
+                'tokens_available': token_budget.tokens,
+                'tokens_per_minute': token_budget.capacity,
+                'blocked_for': max(0.0, requests.blocked_until - now, token_budget.blocked_until - now)
+            }
+
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get the process-wide rate limiter"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter()
+    return _limiter
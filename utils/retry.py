@@ -0,0 +1,246 @@
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import httpx
+import groq
+from config.settings import AppConfig
+from utils.rate_limiter import RateLimitExceeded, parse_reset_duration
+
+RETRY = "retry"
+FALLBACK = "fallback"
+FATAL = "fatal"
+
+
+class CircuitOpenError(Exception):
+    """Raised when every model in the fallback chain is unavailable"""
+
+    def __init__(self, models: List[str]):
+        self.models = models
+        super().__init__(f"Server/Model error: circuit open for {', '.join(models)}")
+
+
+class CircuitBreaker:
+    """Stops sending traffic to a model after repeated failures
+
+    Closed -> open after `failure_threshold` consecutive failures. After
+    `reset_timeout` seconds one trial request is let through (half-open);
+    success closes the circuit, failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Whether a request may be sent now"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def available(self) -> bool:
+        """Whether allow() would let a request through, without claiming the trial"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at >= self.reset_timeout
+            return not self._trial_in_flight
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._trial_in_flight = False
+
+    def release(self) -> None:
+        """End an attempt that says nothing about the model's health (e.g. a quota 429)"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(model: str) -> CircuitBreaker:
+    """Get the process-wide circuit breaker for a model"""
+    with _breakers_lock:
+        breaker = _breakers.get(model)
+        if breaker is None:
+            retry_config = AppConfig.RETRY_CONFIG
+            breaker = CircuitBreaker(
+                retry_config['breaker_failure_threshold'],
+                retry_config['breaker_reset_timeout']
+            )
+            _breakers[model] = breaker
+        return breaker
+
+
+def classify_error(error: Exception) -> str:
+    """Classify an API error as RETRY, FALLBACK (try another model) or FATAL"""
+    if isinstance(error, RateLimitExceeded):
+        # The local budget for this model is spent; another model has its own
+        return FALLBACK
+    if isinstance(error, (groq.APIConnectionError, httpx.TransportError)):
+        return RETRY
+
+    status = getattr(error, 'status_code', None)
+    if status in (408, 409, 429) or (status is not None and status >= 500):
+        return RETRY
+    if status == 404:
+        return FALLBACK
+    if status == 400:
+        message = str(error).lower()
+        if 'model' in message and ('decommissioned' in message or 'not found' in message
+                                   or 'does not exist' in message):
+            return FALLBACK
+    return FATAL
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read a Retry-After hint from an API error, if any"""
+    if isinstance(error, RateLimitExceeded):
+        return error.wait
+    response = getattr(error, 'response', None)
+    if response is None:
+        return None
+    return parse_reset_duration(response.headers.get('retry-after'))
+
+
+class RetryState:
+    """Tracks one logical call across retries and fallback models
+
+    Drivers loop: next_attempt() -> send -> on_success() or on_error(),
+    sleeping for the delay on_error() returns. Both raise once the call
+    should give up.
+    """
+
+    def __init__(self, model: str, deadline: float, config: Dict, max_retries: int):
+        self.config = config
+        self.max_retries = max_retries
+        self.models = [model] + [m for m in AppConfig.MODEL_FALLBACKS.get(model, []) if m != model]
+        self.index = 0
+        self.retries = 0
+        self.total_retries = 0
+        self.deadline_at = time.monotonic() + deadline
+        self.last_error: Optional[Exception] = None
+        self.skipped: List[str] = []
+
+    @property
+    def remaining(self) -> float:
+        return self.deadline_at - time.monotonic()
+
+    def _give_up(self):
+        if self.last_error is not None:
+            raise self.last_error
+        raise CircuitOpenError(self.skipped or self.models)
+
+    def _advance(self) -> None:
+        self.index += 1
+        self.retries = 0
+
+    def next_attempt(self) -> tuple:
+        """Return (model, timeout) for the next attempt"""
+        if self.remaining <= 0:
+            self._give_up()
+
+        while self.index < len(self.models):
+            model = self.models[self.index]
+            if get_circuit_breaker(model).allow():
+                return model, self.remaining
+            self.skipped.append(model)
+            self._advance()
+
+        self._give_up()
+
+    def on_success(self, model: str) -> None:
+        get_circuit_breaker(model).record_success()
+
+    def on_error(self, model: str, error: Exception) -> float:
+        """Record a failed attempt and return the delay before the next one"""
+        self.last_error = error
+        kind = classify_error(error)
+        breaker = get_circuit_breaker(model)
+        if kind == FATAL:
+            # The model answered, only this request was rejected
+            breaker.record_success()
+            raise error
+
+        if isinstance(error, RateLimitExceeded) or getattr(error, 'status_code', None) == 429:
+            # Rate limits are per API key, not a sign the model is down for everyone
+            breaker.release()
+        else:
+            breaker.record_failure()
+
+        has_fallback = self.index + 1 < len(self.models)
+        if kind == FALLBACK:
+            if not has_fallback:
+                raise error
+            self._advance()
+            return 0.0
+
+        if self.retries >= self.max_retries:
+            if not has_fallback:
+                raise error
+            self._advance()
+            return 0.0
+
+        # Full jitter keeps concurrent sessions from retrying in lockstep
+        ceiling = min(self.config['max_delay'], self.config['base_delay'] * (2 ** self.retries))
+        delay = random.uniform(0, ceiling)
+        retry_after = retry_after_seconds(error)
+        if retry_after:
+            delay = max(delay, retry_after)
+
+        if delay >= self.remaining:
+            # Waiting would blow the deadline; a fallback model may answer in time
+            if not has_fallback:
+                raise error
+            self._advance()
+            return 0.0
+
+        self.retries += 1
+        self.total_retries += 1
+        return delay
+
+
+class RetryPolicy:
+    """Retry with exponential backoff, jitter, deadlines and model fallback"""
+
+    def __init__(self, config: Optional[Dict] = None):
+        retry_config = dict(AppConfig.RETRY_CONFIG)
+        retry_config.update(config or {})
+        self.config = retry_config
+        self.max_retries = AppConfig.API_CONFIG['max_retries']
+
+    def start(self, model: str, deadline: Optional[float] = None) -> RetryState:
+        """Begin tracking a call; deadline defaults to API_CONFIG['timeout']"""
+        if deadline is None:
+            deadline = AppConfig.API_CONFIG['timeout']
+        return RetryState(model, deadline, self.config, self.max_retries)
@@ -1,5 +1,16 @@
+import hashlib
 import streamlit as st
-from typing import Dict, Any, List
+import uuid
+from typing import Dict, Any, List, Optional
+from config.settings import AppConfig
+from utils.context_builder import ContextBuilder, context_token_budget
+from utils.summarizer import ConversationSummary
+from utils.autocorrect import AutoCorrector
+from utils.job_manager import Job, get_job_manager
+from utils.prefetcher import get_prefetcher
+from utils.chat_history import ChatHistory
+from utils.client_pool import hash_api_key
+from utils.storage import get_storage, is_valid_conversation_id
 
 class SessionManager:
     """Manages Streamlit session state and initialization"""
@@ -10,12 +21,23 @@ class SessionManager:
     def initialize_session_state(self):
         """Initialize all session state variables with defaults"""
         defaults = {
-            'chat_history': [],
+            'chat_history': None,
             'current_draft': "",
             'autocorrect_enabled': True,
             'api_configured': False,
             'dark_mode': False,
             'suggestions': "",
+            'suggestion_items': None,
+            'assist_mood': None,
+            'all_in_one_help': False,
+            'jobs': {},
+            'last_ttft': None,
+            'suggestions_key': None,
+            'prefetch_now': False,
+            'bulk_grammar_result': None,
+            'transcript_pages': AppConfig.UI_CONFIG['initial_transcript_pages'],
+            'transcript_cache': {},
+            'notifications': [],
             'loading': False,
             'api_key': "",
             'chat_style': "💬 Casual",
@@ -45,38 +67,233 @@ class SessionManager:
     
     def clear_chat_history(self) -> None:
         """Clear chat history and related state"""
+        self.cancel_jobs()
+        self.cancel_prefetch()
+        self.get_chat_history().clear()
         self.update({
-            'chat_history': [],
             'current_draft': "",
-            'suggestions': ""
+            'suggestions': "",
+            'suggestion_items': None,
+            'suggestions_key': None,
+            'assist_mood': None,
+            'conversation_summary': ConversationSummary(),
+            'transcript_pages': AppConfig.UI_CONFIG['initial_transcript_pages'],
+            'transcript_cache': {}
+        })
+    
+    def notify(self, message: str, icon: Optional[str] = None) -> None:
+        """Queue a toast that is shown on the next run, so it survives st.rerun()"""
+        notifications = self.get('notifications')
+        if notifications is None:
+            notifications = []
+            self.set('notifications', notifications)
+        notifications.append((message, icon))
+    
+    def render_notifications(self) -> None:
+        """Show and drain queued notifications"""
+        notifications = self.get('notifications')
+        if not notifications:
+            return
+        self.set('notifications', [])
+        for message, icon in notifications:
+            st.toast(message, icon=icon)
+    
+    def clear_suggestions(self) -> None:
+        """Clear raw and parsed suggestions"""
+        self.cancel_jobs('suggestions')
+        self.update({
+            'suggestions': "",
+            'suggestion_items': None,
+            'assist_mood': None
         })
     
     def add_message(self, message_type: str, text: str) -> None:
         """Add a message to chat history"""
-        import time
+        chat_history = self.get_chat_history()
+        chat_history.append(message_type, text)
+        
+        if message_type == 'received':
+            # Replies to a new message are likely wanted; prefetch without waiting for idle
+            self.set('prefetch_now', True)
         
-        message = {
-            'type': message_type,
-            'text': text,
-            'timestamp': time.time()
+        # Fold older turns into the running summary in the background
+        self.get_conversation_summary().maybe_schedule(chat_history, self.get('api_key', ''))
+    
+    def get_chat_history(self) -> ChatHistory:
+        """Get the session's chat history store
+        
+        It is only persisted once an API key is configured, under a storage
+        id bound to that key, and is reopened when the key changes.
+        """
+        storage = get_storage()
+        storage_id = self._storage_conversation_id() if storage is not None else None
+        chat_history = self.get('chat_history')
+        if chat_history is None or chat_history.conversation_id != storage_id:
+            if storage_id is None:
+                chat_history = ChatHistory()
+            else:
+                storage_config = AppConfig.STORAGE_CONFIG
+                chat_history = ChatHistory.open(
+                    storage,
+                    storage_id,
+                    storage_config['max_resident_messages'],
+                    storage_config['page_size']
+                )
+            self.update({
+                'chat_history': chat_history,
+                'conversation_summary': ConversationSummary(),
+                'transcript_cache': {}
+            })
+        return chat_history
+    
+    def _storage_conversation_id(self) -> Optional[str]:
+        """Storage id of this session's conversation, or None without an API key
+        
+        The URL's conversation id alone is not a credential: anyone with the
+        link would otherwise read and extend the chat. Mixing in the API key
+        hash means a link only resumes the conversation for the same key.
+        """
+        api_key = self.get('api_key', '')
+        if not api_key:
+            return None
+        scoped = f"{hash_api_key(api_key)}:{self.get_conversation_id()}"
+        return hashlib.sha256(scoped.encode('utf-8')).hexdigest()
+    
+    def get_conversation_id(self) -> str:
+        """Get the id of the conversation, kept in the URL so reloads resume it (see _storage_conversation_id)"""
+        conversation_id = self.get('conversation_id')
+        if conversation_id:
+            return conversation_id
+        
+        query_params = getattr(st, 'query_params', None)
+        if query_params is not None and is_valid_conversation_id(query_params.get('conversation', '')):
+            conversation_id = query_params['conversation']
+        else:
+            conversation_id = uuid.uuid4().hex
+            if query_params is not None:
+                query_params['conversation'] = conversation_id
+        
+        self.set('conversation_id', conversation_id)
+        return conversation_id
+    
+    def get_ai_settings(self) -> Dict[str, Any]:
+        """Get the user's settings in the form the AI client expects"""
+        return {
+            'style': self.get('chat_style', '💬 Casual'),
+            'length': self.get('reply_length', '📄 Medium'),
+            'model': self.get('ai_model', '🎯 Balanced'),
+            'temperature': self.get('temperature', 0.7),
+            'max_tokens': self.get('max_tokens', 400)
         }
+    
+    def get_conversation_summary(self) -> ConversationSummary:
+        """Get the running summary of turns that have left the recent window"""
+        summary = self.get('conversation_summary')
+        if summary is None:
+            summary = ConversationSummary()
+            self.set('conversation_summary', summary)
+        return summary
+    
+    def get_autocorrector(self) -> AutoCorrector:
+        """Get the background auto-correct pipeline for the compose draft"""
+        autocorrector = self.get('autocorrector')
+        if autocorrector is None:
+            autocorrector = AutoCorrector()
+            self.set('autocorrector', autocorrector)
+        return autocorrector
+    
+    def get_session_id(self) -> str:
+        """Get an id for this browser session (used to cap its background jobs)"""
+        session_id = self.get('session_id')
+        if not session_id:
+            session_id = uuid.uuid4().hex
+            self.set('session_id', session_id)
+        return session_id
+    
+    def _get_jobs(self) -> Dict[str, Job]:
+        jobs = self.get('jobs')
+        if jobs is None:
+            jobs = {}
+            self.set('jobs', jobs)
+        return jobs
+    
+    def submit_job(self, name: str, key: str, fn, *args, **kwargs) -> Job:
+        """Start fn(job, *args, **kwargs) in the background, replacing any job with the same name
+        
+        Raises JobLimitExceeded when this session is at its concurrency cap.
+        """
+        self.cancel_jobs(name)
+        job = get_job_manager().submit(self.get_session_id(), name, key, fn, *args, **kwargs)
+        self._get_jobs()[name] = job
+        return job
+    
+    def adopt_job(self, name: str, job: Job) -> None:
+        """Track a job started elsewhere (e.g. a prefetch) as if it had been submitted here"""
+        self.cancel_jobs(name)
+        self._get_jobs()[name] = job
+    
+    def cancel_prefetch(self) -> None:
+        """Drop this session's pending speculative prefetch"""
+        get_prefetcher().cancel(self.get_session_id())
+    
+    def get_job(self, name: str) -> Optional[Job]:
+        """Get a submitted job that has not been collected yet"""
+        return self._get_jobs().get(name)
+    
+    def pop_job(self, name: str) -> Optional[Job]:
+        """Remove and return a job once its result has been used"""
+        return self._get_jobs().pop(name, None)
+    
+    def cancel_jobs(self, name: Optional[str] = None) -> None:
+        """Cancel one job by name, or all of this session's jobs"""
+        jobs = self._get_jobs()
+        for job_name in [name] if name else list(jobs):
+            job = jobs.pop(job_name, None)
+            if job is not None:
+                job.cancel()
+    
+    def cancel_stale_jobs(self, key: str) -> None:
+        """Cancel jobs started for a different input (e.g. the draft was edited)
         
-        chat_history = self.get('chat_history', [])
-        chat_history.append(message)
-        self.set('chat_history', chat_history)
+        Jobs submitted with key None are not tied to the draft and are kept.
+        """
+        jobs = self._get_jobs()
+        for name in [name for name, job in jobs.items() if job.key is not None and job.key != key]:
+            jobs.pop(name).cancel()
     
-    def get_chat_context(self, max_messages: int = 6) -> str:
-        """Get recent chat context for AI processing"""
-        chat_history = self.get('chat_history', [])
+    def rekey_jobs(self, old_key: str, new_key: str) -> None:
+        """Carry jobs started for `old_key` over to `new_key` (e.g. the draft was auto-corrected)"""
+        for job in self._get_jobs().values():
+            if job.key is not None and job.key == old_key:
+                job.key = new_key
+    
+    def get_chat_context(self, max_messages: Optional[int] = None, model_key: Optional[str] = None) -> str:
+        """Get the running summary plus recent chat, trimmed to the model's token budget"""
+        chat_history = self.get_chat_history()
         
         if not chat_history:
             return "Friend: Hey! How's your day going? 😊\n"
         
-        context = ""
-        for msg in chat_history[-max_messages:]:
-            sender = "Friend" if msg['type'] == 'received' else "You"
-            context += f"{sender}: {msg['text']}\n"
+        if max_messages is None:
+            max_messages = self.get('context_messages', 6)
+        
+        # Messages already folded into the summary don't need to be repeated
+        summary, summarized_upto = self.get_conversation_summary().snapshot()
+        max_messages = min(max_messages, len(chat_history) - summarized_upto)
+        
+        token_budget = context_token_budget(
+            model_key or self.get('ai_model', '🎯 Balanced'),
+            self.get('max_tokens', 400)
+        )
+        
+        builder = self.get('context_builder')
+        if builder is None:
+            builder = ContextBuilder()
+            self.set('context_builder', builder)
         
+        context = builder.build(chat_history, max_messages, token_budget)
+        if summary:
+            context = f"Summary of earlier conversation: {summary}\n{context}"
         return context
     
     def reset_action_flags(self) -> None:
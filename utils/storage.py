@@ -0,0 +1,310 @@
+import atexit
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import AppConfig
+
+# (type code, text, timestamp); type code 0 = sent, 1 = received
+Record = Tuple[int, str, float]
+
+_CONVERSATION_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def is_valid_conversation_id(conversation_id: str) -> bool:
+    """Conversation ids end up in file names, so keep them to a safe alphabet"""
+    return bool(conversation_id and _CONVERSATION_ID.match(conversation_id))
+
+
+class StorageBackend:
+    """Persistent, append-only message storage keyed by conversation id"""
+
+    def append(self, conversation_id: str, records: List[Record]) -> None:
+        raise NotImplementedError
+
+    def load(self, conversation_id: str, offset: int, limit: int) -> List[Record]:
+        """Load up to `limit` messages starting at position `offset`"""
+        raise NotImplementedError
+
+    def stats(self, conversation_id: str) -> Tuple[int, int]:
+        """Get (total messages, received messages)"""
+        raise NotImplementedError
+
+    def clear(self, conversation_id: str) -> None:
+        raise NotImplementedError
+
+    def purge(self, older_than: float) -> int:
+        """Delete conversations last written before `older_than` (epoch seconds); returns how many"""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteStorage(StorageBackend):
+    """SQLite backend in WAL mode so readers never block the writer"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "conversation_id TEXT NOT NULL, seq INTEGER NOT NULL, type INTEGER NOT NULL, "
+                "text TEXT NOT NULL, timestamp REAL NOT NULL, PRIMARY KEY (conversation_id, seq))"
+            )
+
+    def append(self, conversation_id: str, records: List[Record]) -> None:
+        with self._lock, self._conn:
+            next_seq = self._conn.execute(
+                "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages WHERE conversation_id = ?",
+                (conversation_id,)
+            ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT INTO messages (conversation_id, seq, type, text, timestamp) VALUES (?, ?, ?, ?, ?)",
+                [(conversation_id, next_seq + i, code, text, timestamp)
+                 for i, (code, text, timestamp) in enumerate(records)]
+            )
+
+    def load(self, conversation_id: str, offset: int, limit: int) -> List[Record]:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT type, text, timestamp FROM messages WHERE conversation_id = ? AND seq >= ? "
+                "ORDER BY seq LIMIT ?",
+                (conversation_id, offset, limit)
+            ).fetchall()
+
+    def stats(self, conversation_id: str) -> Tuple[int, int]:
+        with self._lock:
+            total, received = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(type), 0) FROM messages WHERE conversation_id = ?",
+                (conversation_id,)
+            ).fetchone()
+        return total, received
+
+    def clear(self, conversation_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+
+    def purge(self, older_than: float) -> int:
+        with self._lock, self._conn:
+            expired = [row[0] for row in self._conn.execute(
+                "SELECT conversation_id FROM messages GROUP BY conversation_id HAVING MAX(timestamp) < ?",
+                (older_than,)
+            )]
+            self._conn.executemany(
+                "DELETE FROM messages WHERE conversation_id = ?", [(cid,) for cid in expired]
+            )
+        return len(expired)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class JSONLStorage(StorageBackend):
+    """Append-only JSON Lines files, one per conversation
+
+    A byte-offset index of each file is built on first access, so pages
+    are read with a seek instead of a scan.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._offsets: Dict[str, array] = {}
+        self._received: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, conversation_id: str) -> str:
+        return os.path.join(self.directory, f"{conversation_id}.jsonl")
+
+    def _index(self, conversation_id: str) -> array:
+        offsets = self._offsets.get(conversation_id)
+        if offsets is None:
+            offsets = array('Q')
+            received = 0
+            path = self._path(conversation_id)
+            if os.path.exists(path):
+                with open(path, 'rb') as handle:
+                    position = 0
+                    for line in handle:
+                        offsets.append(position)
+                        position += len(line)
+                        received += json.loads(line)['t']
+            self._offsets[conversation_id] = offsets
+            self._received[conversation_id] = received
+        return offsets
+
+    def append(self, conversation_id: str, records: List[Record]) -> None:
+        with self._lock:
+            offsets = self._index(conversation_id)
+            with open(self._path(conversation_id), 'ab') as handle:
+                position = handle.tell()
+                for code, text, timestamp in records:
+                    line = (json.dumps({'t': code, 'x': text, 'ts': timestamp}, ensure_ascii=False) + "\n").encode('utf-8')
+                    handle.write(line)
+                    offsets.append(position)
+                    position += len(line)
+                    self._received[conversation_id] += code
+
+    def load(self, conversation_id: str, offset: int, limit: int) -> List[Record]:
+        with self._lock:
+            offsets = self._index(conversation_id)
+            if offset >= len(offsets):
+                return []
+            records = []
+            with open(self._path(conversation_id), 'rb') as handle:
+                handle.seek(offsets[offset])
+                for _ in range(min(limit, len(offsets) - offset)):
+                    entry = json.loads(handle.readline())
+                    records.append((entry['t'], entry['x'], entry['ts']))
+            return records
+
+    def stats(self, conversation_id: str) -> Tuple[int, int]:
+        with self._lock:
+            offsets = self._index(conversation_id)
+            return len(offsets), self._received[conversation_id]
+
+    def clear(self, conversation_id: str) -> None:
+        with self._lock:
+            path = self._path(conversation_id)
+            if os.path.exists(path):
+                os.remove(path)
+            self._offsets[conversation_id] = array('Q')
+            self._received[conversation_id] = 0
+
+    def purge(self, older_than: float) -> int:
+        purged = 0
+        with self._lock:
+            for name in os.listdir(self.directory):
+                path = os.path.join(self.directory, name)
+                if name.endswith('.jsonl') and os.path.getmtime(path) < older_than:
+                    os.remove(path)
+                    conversation_id = name[:-len('.jsonl')]
+                    self._offsets.pop(conversation_id, None)
+                    self._received.pop(conversation_id, None)
+                    purged += 1
+        return purged
+
+
+class BatchedStorage(StorageBackend):
+    """Buffers appends and writes them to a backend in batches
+
+    A batch is written once it reaches `batch_size` messages or has waited
+    `flush_interval` seconds, and always before any read so readers see
+    every message.
+    """
+
+    def __init__(self, backend: StorageBackend, batch_size: int, flush_interval: float):
+        self.backend = backend
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._pending: Dict[str, List[Record]] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.RLock()
+
+    def append(self, conversation_id: str, records: List[Record]) -> None:
+        with self._lock:
+            pending = self._pending.setdefault(conversation_id, [])
+            pending.extend(records)
+            if len(pending) >= self.batch_size:
+                self._flush_conversation(conversation_id)
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_conversation(self, conversation_id: str) -> None:
+        pending = self._pending.pop(conversation_id, None)
+        if pending:
+            self.backend.append(conversation_id, pending)
+
+    def flush(self) -> None:
+        """Write every buffered message"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            for conversation_id in list(self._pending):
+                self._flush_conversation(conversation_id)
+
+    def load(self, conversation_id: str, offset: int, limit: int) -> List[Record]:
+        with self._lock:
+            self._flush_conversation(conversation_id)
+            return self.backend.load(conversation_id, offset, limit)
+
+    def stats(self, conversation_id: str) -> Tuple[int, int]:
+        with self._lock:
+            self._flush_conversation(conversation_id)
+            return self.backend.stats(conversation_id)
+
+    def clear(self, conversation_id: str) -> None:
+        with self._lock:
+            self._pending.pop(conversation_id, None)
+            self.backend.clear(conversation_id)
+
+    def purge(self, older_than: float) -> int:
+        with self._lock:
+            self.flush()
+            return self.backend.purge(older_than)
+
+    def close(self) -> None:
+        self.flush()
+        self.backend.close()
+
+
+def build_storage(config: Optional[Dict] = None) -> Optional[StorageBackend]:
+    """Create the configured storage backend, or None for in-memory only"""
+    storage_config = dict(AppConfig.STORAGE_CONFIG)
+    storage_config.update(config or {})
+
+    if storage_config['backend'] == 'sqlite':
+        backend = SQLiteStorage(storage_config['sqlite_path'])
+    elif storage_config['backend'] == 'jsonl':
+        backend = JSONLStorage(storage_config['jsonl_dir'])
+    else:
+        return None
+
+    return BatchedStorage(backend, storage_config['batch_size'], storage_config['flush_interval'])
+
+
+_storage: Optional[StorageBackend] = None
+_storage_ready = False
+_next_purge = 0.0
+_storage_lock = threading.Lock()
+
+
+def get_storage() -> Optional[StorageBackend]:
+    """Get the process-wide conversation storage (None when disabled)
+
+    Conversations past their retention are purged on first use and then
+    at most once per purge_interval.
+    """
+    global _storage, _storage_ready, _next_purge
+    if not _storage_ready:
+        with _storage_lock:
+            if not _storage_ready:
+                _storage = build_storage()
+                if _storage is not None:
+                    atexit.register(_storage.close)
+                _storage_ready = True
+
+    if _storage is not None and time.monotonic() >= _next_purge:
+        storage_config = AppConfig.STORAGE_CONFIG
+        with _storage_lock:
+            if time.monotonic() >= _next_purge:
+                _next_purge = time.monotonic() + storage_config['purge_interval']
+                _storage.purge(time.time() - storage_config['retention_days'] * 86400)
+    return _storage
@@ -0,0 +1,163 @@
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+@dataclass(frozen=True)
+class Suggestion:
+    """A single reply suggestion shown in the suggestions panel"""
+
+    kind: str  # 'improved' or 'option'
+    label: str
+    text: str
+
+
+def parse_structured_suggestions(content: str, max_options: Optional[int] = None) -> Optional[List[Suggestion]]:
+    """Validate a JSON-mode completion and turn it into suggestions
+
+    Expects {"improved": str, "options": [str, ...]}. Returns None when the
+    payload does not match so callers can fall back to the text parser.
+    """
+    try:
+        payload = json.loads(content)
+    except (TypeError, ValueError):
+        return None
+
+    if not isinstance(payload, dict):
+        return None
+
+    improved = payload.get('improved')
+    options = payload.get('options')
+    if improved is not None and not isinstance(improved, str):
+        return None
+    if not isinstance(options, list) or not all(isinstance(option, str) for option in options):
+        return None
+
+    suggestions = []
+    if improved and improved.strip():
+        suggestions.append(Suggestion('improved', 'Improved', improved.strip()))
+
+    options = [option.strip() for option in options if option.strip()]
+    if max_options is not None:
+        options = options[:max_options]
+    for number, option in enumerate(options, start=1):
+        suggestions.append(Suggestion('option', f'Option {number}', option))
+
+    return suggestions or None
+
+
+def parse_text_suggestions(content: str) -> List[Suggestion]:
+    """Scrape '**✨ Improved:** ...' style lines (fallback for free-text output)"""
+    suggestions = []
+
+    for line in content.split('\n'):
+        if line.strip() and ('**' in line or 'Improved:' in line or 'Option' in line):
+            # Clean up the line and extract content
+            clean_line = line.replace('*', '').replace('<strong>', '').replace('</strong>', '').strip()
+
+            if ':' in clean_line:
+                label, suggestion_text = clean_line.split(':', 1)
+                label = label.replace('✨', '').replace('💡', '').strip()
+                suggestion_text = suggestion_text.strip().strip('"').strip("'")
+
+                if suggestion_text and len(suggestion_text) > 3:
+                    kind = 'improved' if 'improved' in label.lower() else 'option'
+                    suggestions.append(Suggestion(kind, label, suggestion_text))
+
+    return suggestions
+
+
+def parse_suggestions(content: str, max_options: Optional[int] = None) -> List[Suggestion]:
+    """Parse a completion as structured JSON, falling back to text scraping"""
+    structured = parse_structured_suggestions(content, max_options)
+    if structured is not None:
+        return structured
+    return parse_text_suggestions(content)
+
+
+MOODS = ('positive', 'negative', 'neutral', 'excited', 'confused', 'romantic', 'professional')
+
+
+@dataclass(frozen=True)
+class Assistance:
+    """Result of a single-call assist: corrected draft, reply options and mood"""
+
+    corrected_text: str
+    suggestions: List[Suggestion]
+    mood: str
+    confidence: float
+
+    def mood_analysis(self) -> dict:
+        """Mood in the dict shape used by analyze_conversation_mood"""
+        return {'mood': self.mood, 'confidence': self.confidence}
+
+
+def parse_assistance(content: str, draft: str, max_options: Optional[int] = None) -> Assistance:
+    """Parse an assist completion; invalid fields degrade to safe defaults"""
+    try:
+        payload = json.loads(content)
+    except (TypeError, ValueError):
+        payload = None
+
+    if not isinstance(payload, dict):
+        # Model ignored JSON mode; salvage any suggestion lines
+        return Assistance(draft, parse_text_suggestions(content or ""), 'neutral', 0.5)
+
+    corrected = payload.get('corrected')
+    if not isinstance(corrected, str) or not corrected.strip():
+        corrected = draft
+    corrected = corrected.strip()
+
+    options = payload.get('options')
+    if not isinstance(options, list):
+        options = []
+    options = [option.strip() for option in options if isinstance(option, str) and option.strip()]
+    if max_options is not None:
+        options = options[:max_options]
+
+    suggestions = [Suggestion('improved', 'Improved', corrected)]
+    for number, option in enumerate(options, start=1):
+        suggestions.append(Suggestion('option', f'Option {number}', option))
+
+    mood = payload.get('mood')
+    if not isinstance(mood, str) or mood.lower() not in MOODS:
+        mood = 'neutral'
+
+    try:
+        confidence = min(1.0, max(0.0, float(payload.get('confidence', 0.5))))
+    except (TypeError, ValueError):
+        confidence = 0.5
+
+    return Assistance(corrected, suggestions, mood.lower(), confidence)
+
+
+def parse_grammar_batch(content: str, ids: List[int]) -> Dict[int, str]:
+    """Parse a batched grammar completion ({"items": [{"id", "text"}]})
+
+    Returns corrected text for every id that came back well-formed; ids
+    that are missing or invalid are left out so callers can retry them.
+    """
+    try:
+        payload = json.loads(content)
+    except (TypeError, ValueError):
+        return {}
+
+    items = payload.get('items') if isinstance(payload, dict) else None
+    if not isinstance(items, list):
+        return {}
+
+    wanted = set(ids)
+    corrected = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        item_id = item.get('id')
+        text = item.get('text')
+        if isinstance(item_id, str) and item_id.isdigit():
+            item_id = int(item_id)
+        if not isinstance(item_id, int) or isinstance(item_id, bool):
+            # Lists, dicts, floats and booleans are not ids we sent
+            continue
+        if item_id in wanted and isinstance(text, str) and text.strip():
+            corrected[item_id] = text.strip()
+    return corrected
@@ -0,0 +1,75 @@
+import threading
+from typing import Dict, List
+
+from config.settings import AppConfig
+from utils.chat_history import ChatHistory
+
+
+class ConversationSummary:
+    """Running summary of older chat turns, folded in on a background thread
+
+    Lives in session state. Worker threads only touch this object (never
+    st.session_state), guarded by its own lock.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.summarized_upto = 0
+        self.in_flight = False
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> tuple:
+        """Get (summary text, number of messages it covers)"""
+        with self._lock:
+            return self.text, self.summarized_upto
+
+    def maybe_schedule(self, history: ChatHistory, api_key: str) -> bool:
+        """Start folding older turns into the summary once enough have piled up"""
+        config = AppConfig.SUMMARY_CONFIG
+        if not config['enabled'] or not api_key:
+            return False
+
+        with self._lock:
+            fold_upto = len(history) - config['keep_recent']
+            if self.in_flight or fold_upto - self.summarized_upto < config['every_messages']:
+                return False
+            self.in_flight = True
+            previous = self.text
+            # Bound the fold so a long stored backlog is never sent in one go
+            fold_from = max(self.summarized_upto, fold_upto - config['max_fold_messages'])
+            pending = [message.to_dict() for message in history[fold_from:fold_upto]]
+
+        worker = threading.Thread(
+            target=self._fold,
+            args=(api_key, previous, pending, fold_upto),
+            daemon=True
+        )
+        worker.start()
+        return True
+
+    def _fold(self, api_key: str, previous: str, messages: List[Dict], fold_upto: int) -> None:
+        from utils.ai_client import AIClient
+
+        try:
+            summary = AIClient(api_key).summarize_conversation(previous, messages)
+        except Exception as e:
+            with self._lock:
+                self.in_flight = False
+                self.last_error = str(e)
+            return
+
+        with self._lock:
+            self.text = summary
+            self.summarized_upto = fold_upto
+            self.in_flight = False
+            self.last_error = None
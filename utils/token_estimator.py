@@ -0,0 +1,114 @@
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from config.settings import AppConfig
+
+# Pieces a Llama 3 style BPE tokenizer tends to keep whole: a word with its
+# leading space, up to three digits, a run of other symbols, or whitespace.
+_PIECES = re.compile(r" ?[A-Za-z]+| ?\d{1,3}| ?[^\sA-Za-z\d]+|\s+")
+
+# Chat template tokens around each message, and before the reply
+MESSAGE_OVERHEAD_TOKENS = 4
+REPLY_PRIMING_TOKENS = 3
+
+
+def count_tokens(text: str) -> int:
+    """Approximate token count for Llama 3 models, without loading a tokenizer"""
+    tokens = 0
+    for piece in _PIECES.findall(text or ""):
+        core = piece.strip()
+        if not core:
+            tokens += 1
+        elif core.isalpha() and core.isascii():
+            # Common words are one token; long ones split every ~7 characters
+            tokens += 1 + (len(core) - 1) // 7
+        elif core.isdigit():
+            tokens += 1
+        else:
+            # Punctuation merges in short runs; emoji and accents cost by UTF-8 length
+            tokens += math.ceil(len(core.encode("utf-8")) / 3)
+    return tokens
+
+
+def count_message_tokens(messages: List[Dict]) -> int:
+    """Approximate prompt tokens of a chat completion request"""
+    return REPLY_PRIMING_TOKENS + sum(
+        MESSAGE_OVERHEAD_TOKENS + count_tokens(message.get('content') or "") for message in messages
+    )
+
+
+def estimate_max_tokens(task: str, text: str = "", length: Optional[str] = None,
+                        ceiling: Optional[int] = None) -> int:
+    """Tight max_tokens for a task: a fixed allowance, a share of the input and replies at the chosen length
+
+    `ceiling` (usually the user's max tokens setting) caps the result.
+    """
+    config = AppConfig.OUTPUT_TOKEN_CONFIG
+    task_config = config['tasks'].get(task, config['tasks']['chat'])
+    reply_tokens = config['reply_tokens'].get(length, config['reply_tokens'][AppConfig.DEFAULTS['reply_length']])
+
+    budget = (task_config['base']
+              + math.ceil(task_config['input_ratio'] * count_tokens(text))
+              + task_config['replies'] * reply_tokens)
+    for cap in (task_config.get('cap'), ceiling):
+        if cap:
+            budget = min(budget, cap)
+    return max(1, budget)
+
+
+def estimate_cost(model_id: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+    """Cost in USD, or None when the model has no configured price"""
+    price = AppConfig.MODEL_PRICING.get(model_id)
+    if price is None:
+        return None
+    return (prompt_tokens * price['input'] + completion_tokens * price['output']) / 1_000_000
+
+
+@dataclass(frozen=True)
+class RequestEstimate:
+    """What a request is expected to cost before it is sent (worst case: all of max_tokens is used)"""
+
+    model: str
+    prompt_tokens: int
+    max_tokens: int
+    cost: Optional[float]
+    latency: Optional[float]
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.max_tokens
+
+    def describe(self) -> str:
+        parts = [f"≈{self.prompt_tokens} in / ≤{self.max_tokens} out tokens"]
+        if self.cost is not None:
+            parts.append(f"≤${self.cost:.5f}")
+        if self.latency is not None:
+            parts.append(f"~{self.latency:.1f}s")
+        return " · ".join(parts)
+
+
+def estimate_request(messages: List[Dict], max_tokens: int, model_id: str) -> RequestEstimate:
+    """Estimate prompt size, cost and latency of one completion"""
+    from utils.model_router import get_model_router
+
+    prompt_tokens = count_message_tokens(messages)
+    return RequestEstimate(
+        model=model_id,
+        prompt_tokens=prompt_tokens,
+        max_tokens=max_tokens,
+        cost=estimate_cost(model_id, prompt_tokens, max_tokens),
+        latency=get_model_router().predict_model_latency(model_id, prompt_tokens, max_tokens)
+    )
+
+
+def estimate_suggestions(user_input: str, context: str, settings: Dict) -> RequestEstimate:
+    """Estimate a suggestions request from the draft and settings, without an API client"""
+    from utils.model_router import get_model_router
+    from utils.prompt_templates import build_suggestion_messages
+
+    messages = build_suggestion_messages(user_input, context, settings)
+    max_tokens = estimate_max_tokens('suggestions', user_input, settings.get('length'), settings.get('max_tokens', 400))
+    model_id = get_model_router().select(settings, 'suggestions', messages, user_input, max_tokens)
+    return estimate_request(messages, max_tokens, model_id)